@@ -1,10 +1,13 @@
 import streamlit as st
 
+from utils import profiler, startup
+
 st.set_page_config(
     page_title="My Streamlit Site",
     page_icon="📊",
     layout="wide"
 )
+prof = profiler.start("app")
 
 st.title(" Welcome to My Streamlit Site")
 st.markdown(
@@ -28,4 +31,16 @@ with st.expander("How this app is organized (for students)"):
         """
     )
 
+with st.expander("🚀 Startup times (this server process)"):
+    first_runs, warm = startup.report()
+    st.write(f"Background pre-warm: **{warm['state']}**")
+    if warm["state"] == "done":
+        st.caption(f"Imports {warm['imports_ms']} ms · datasets {warm['datasets_ms']} ms · "
+                   f"finished {warm['finished_after_s']} s after the first page run")
+    for error in warm["errors"]:
+        st.caption(f"⚠️ {error}")
+    if first_runs:
+        st.table(first_runs)
+
 st.caption("Built with Streamlit • Class template")
+prof.finish()
@@ -0,0 +1,12 @@
+"""Benchmark suite for the pages (run from the streamlit_CS folder).
+
+    python -m bench.run                        # every page, datasets at 1x and 100x
+    python -m bench.run --scales 1,100,10000   # add the 10,000x datasets (slow to build)
+    python -m bench.run --save before          # store a baseline ...
+    python -m bench.run --compare before       # ... and check a change against it
+    python -m bench.loadgen --sessions 1,10,50 # concurrent sessions against a real server
+
+Nothing here talks to the real APIs: `stub_server` serves the recorded
+responses in `fixtures/`, and `datasets` writes seeded, scaled copies of the
+pie/tips/gapminder data to `bench/.data/` (BENCH_DATA_DIR).
+"""
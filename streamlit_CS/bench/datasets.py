@@ -0,0 +1,107 @@
+"""Synthetic, scaled copies of the datasets behind the chart pages.
+
+`prepare(scale)` writes (once) and returns the CSV paths for `scale`x the
+rows of pie_demo.csv, Plotly's tips and Plotly's gapminder, plus the
+environment variables that point the pages at them. The data is seeded, so
+every run of the benchmark sees the same rows.
+
+- pie: each scale-up adds numbered categories ("Apples 17") and rows, so
+  the top-N + "Other" grouping has real work to do
+- tips: rows resampled from the original with a little noise on bill/tip
+- gapminder: whole copies of every country ("France #17"), so year and
+  continent filters still return `scale`x the rows they do today
+
+10,000x gapminder is about 17M rows (~1 GB of CSV); it is written in
+chunks, but expect it to take a while the first time.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(os.environ.get("BENCH_DATA_DIR", Path(__file__).parent / ".data"))
+PIE_SOURCE = Path(__file__).parent.parent / "data" / "pie_demo.csv"
+CHUNK_ROWS = 1_000_000
+
+
+def _write_chunks(path: Path, chunks):
+    """Write an iterable of frames to `path` as one CSV, atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    os.replace(tmp, path)
+
+
+def make_pie(scale: int, path: Path):
+    base = pd.read_csv(PIE_SOURCE)
+    rng = np.random.default_rng(scale)
+    rows = len(base) * scale
+    copies = max(1, min(scale, 200))  # up to 200 variants per base category
+
+    def chunks():
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            pick = rng.integers(0, len(base), n)
+            variant = rng.integers(0, copies, n)
+            names = base["Category"].to_numpy()[pick].astype(object)
+            if copies > 1:
+                names = names + np.char.mod(" %d", variant).astype(object)
+            values = base["Value"].to_numpy()[pick] * rng.uniform(0.5, 1.5, n)
+            yield pd.DataFrame({"Category": names, "Value": values.round(2)})
+
+    _write_chunks(path, chunks())
+
+
+def make_tips(scale: int, path: Path):
+    import plotly.express as px
+
+    base = px.data.tips()
+    rng = np.random.default_rng(scale)
+    rows = len(base) * scale
+
+    def chunks():
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+            if scale > 1:
+                df["total_bill"] = (df["total_bill"] * rng.uniform(0.9, 1.1, n)).round(2)
+                df["tip"] = (df["tip"] * rng.uniform(0.9, 1.1, n)).round(2)
+            yield df
+
+    _write_chunks(path, chunks())
+
+
+def make_gapminder(scale: int, path: Path):
+    import plotly.express as px
+
+    base = px.data.gapminder()
+    per_chunk = max(1, CHUNK_ROWS // len(base))
+
+    def chunks():
+        for start in range(0, scale, per_chunk):
+            copies = range(start, min(scale, start + per_chunk))
+            frames = []
+            for copy in copies:
+                df = base if copy == 0 else base.assign(country=base["country"] + f" #{copy}")
+                frames.append(df)
+            yield pd.concat(frames, ignore_index=True)
+
+    _write_chunks(path, chunks())
+
+
+MAKERS = {"pie": make_pie, "tips": make_tips, "gapminder": make_gapminder}
+ENV_VARS = {"pie": "PIE_DATA_PATH", "tips": "TIPS_DATA_PATH", "gapminder": "GAPMINDER_DATA_PATH"}
+
+
+def prepare(scale: int) -> dict:
+    """Write any missing datasets for `scale` and return the env vars pointing at them."""
+    env = {}
+    for name, make in MAKERS.items():
+        path = DATA_DIR / f"{name}-x{scale}.csv"
+        if not path.exists():
+            print(f"[bench] writing {path.name} ...", flush=True)
+            make(scale, path)
+        env[ENV_VARS[name]] = str(path)
+    return env
@@ -0,0 +1,489 @@
+"""Load test: N concurrent browser sessions against one real server process.
+
+    python -m bench.loadgen                                # 1, 5, 10 and 25 sessions, 30 s each
+    python -m bench.loadgen --sessions 1,10,50 --duration 60 --think-ms 500
+    python -m bench.loadgen --auto-refresh                 # also run the pages' refresh timers
+
+Starts `streamlit run app.py` on a free port, with API traffic going to the
+local stub server and fresh on-disk caches. Each simulated session talks to
+the server over Streamlit's websocket protocol, like a browser tab does. It
+opens a page, waits for the run to finish, clicks through that page's
+widgets (the steps in `bench.run.SCENARIOS`), pauses for the think time
+between clicks, and moves on to the next page. Sessions start on different
+pages, so every page is under load at once. With `--auto-refresh`, sessions
+switch the CoinGecko/Open-Meteo auto-refresh on and fire the fragment
+timers the server asks for, as a browser would.
+
+Before the first level, one session visits every page once, so shared
+caches are warm. The process RSS at that point is the baseline. For each
+level the report shows:
+
+- rerun latency (send -> script finished) p50/p95/p99/max, and reruns/s;
+- KiB received per rerun and the number of runs that raised;
+- server peak RSS, (peak - baseline) / sessions, and peak thread count,
+  all sampled from /proc while the level runs (Linux only);
+- what the Admin page reports at the end of the level (sessions, session
+  state, caches), read through one more session.
+
+The client sends full messages and keeps no browser message cache, so the
+bytes figures are an upper bound.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench.run import BASELINE_DIR, PAGES_DIR, ROOT, SCENARIOS, _percentile
+
+ADMIN_PAGE = "8_Admin.py"
+SIDEBAR = 1  # delta_path[0] of elements drawn in st.sidebar
+RUN_TIMEOUT = 60.0  # seconds a run may take before the session counts as stuck
+
+
+# ---------- a page as the client sees it ----------
+class RemoteWidget:
+    """One widget from the last run, with the subset of AppTest's interaction API the scenarios use."""
+
+    def __init__(self, session, kind: str, proto):
+        self.session = session
+        self.kind = kind
+        self.proto = proto
+        self.id = proto.id
+        self.label = proto.label
+        self.options = list(getattr(proto, "options", []))
+        self.min = getattr(proto, "min", None)
+        self.max = getattr(proto, "max", None)
+
+    @property
+    def value(self):
+        if self.id in self.session.values:
+            return self.session.values[self.id]
+        p = self.proto
+        if self.kind == "multiselect":
+            return [self.options[i] for i in p.default]
+        if self.kind in ("radio", "selectbox"):
+            return self.options[p.default] if self.options else None
+        if self.kind == "slider":
+            values = list(p.value if p.set_value else p.default)
+            return values[0] if len(values) == 1 else tuple(values)
+        if self.kind in ("checkbox", "toggle", "number_input", "text_input"):
+            return p.value if p.set_value else p.default
+        return None
+
+    def _option(self, v) -> str:
+        """The displayed option for `v`: exact label, else case-insensitive, else label prefix ("solana" -> "Solana (SOL)")."""
+        text = str(v)
+        for match in (lambda o: o == text, lambda o: o.lower() == text.lower(),
+                      lambda o: o.lower().startswith(text.lower())):
+            for option in self.options:
+                if match(option):
+                    return option
+        raise LookupError(f"{self.label!r} has no option {v!r}")
+
+    def set_value(self, v):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        ws = WidgetState(id=self.id)
+        if self.kind == "multiselect":
+            v = [self._option(x) for x in v]
+            ws.string_array_value.data[:] = v
+        elif self.kind in ("radio", "selectbox"):
+            v = self._option(v)
+            ws.string_value = v
+        elif self.kind == "slider":
+            ws.double_array_value.data[:] = [float(x) for x in (v if isinstance(v, (list, tuple)) else [v])]
+        elif self.kind in ("checkbox", "toggle"):
+            ws.bool_value = bool(v)
+        elif self.kind == "number_input":
+            ws.double_value = float(v)
+        elif self.kind == "text_input":
+            ws.string_value = str(v)
+        elif self.kind == "button":
+            ws.trigger_value = True
+        self.session.set_state(ws, v)
+        return self
+
+    def select(self, v):
+        current = list(self.value)
+        return self if self._option(v) in current else self.set_value(current + [v])
+
+    def unselect(self, v):
+        option = self._option(v)
+        return self.set_value([x for x in self.value if x != option])
+
+    def check(self):
+        return self.set_value(True)
+
+    def uncheck(self):
+        return self.set_value(False)
+
+    def click(self):
+        return self.set_value(True)
+
+
+class RemotePage:
+    """`at.multiselect`, `at.sidebar.slider`, ... over the widgets of the last run."""
+
+    def __init__(self, session, sidebar_only: bool = False):
+        self._session = session
+        self._sidebar_only = sidebar_only
+
+    @property
+    def sidebar(self):
+        return RemotePage(self._session, sidebar_only=True)
+
+    def __getattr__(self, kind):
+        if kind.startswith("_"):
+            raise AttributeError(kind)
+        return [w for path, w in self._session.widgets.items()
+                if w.kind == kind and (not self._sidebar_only or path[0] == SIDEBAR)]
+
+
+# ---------- one simulated browser tab ----------
+class Session:
+    def __init__(self, url: str):
+        self.url = url
+        self.ws = None
+        self.pages = {}          # page file -> page_script_hash
+        self.page_hash = ""
+        self.widgets = {}        # delta path -> RemoteWidget, from the last full run
+        self.metrics = {}        # metric label -> value, from the last full run
+        self.states = {}         # widget id -> WidgetState this tab has set
+        self.values = {}         # widget id -> value this tab has set
+        self.triggers = set()    # button ids to send once
+        self.timers = {}         # fragment id -> [interval s, next due]
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self.run()  # main page; also tells us the page hashes
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def set_state(self, ws, value):
+        self.states[ws.id] = ws
+        self.values[ws.id] = value
+        if ws.WhichOneof("value") == "trigger_value":
+            self.triggers.add(ws.id)
+
+    async def open(self, page: str) -> dict:
+        self.page_hash = self.pages[page]
+        self.states, self.values, self.triggers, self.timers = {}, {}, set(), {}
+        return await self.run()
+
+    async def run(self, fragment_id: str = "") -> dict:
+        """Send one rerun with this tab's widget states; returns {ms, bytes, errors}."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        for widget_id in self.triggers:  # buttons are True for one run only
+            self.states.pop(widget_id, None)
+            self.values.pop(widget_id, None)
+        self.triggers = set()
+
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets, metrics, received, errors = {}, {}, 0, 0
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), RUN_TIMEOUT)
+            received += len(raw)
+            fm = ForwardMsg()
+            fm.ParseFromString(raw)
+            kind = fm.WhichOneof("type")
+            if kind == "script_finished":
+                break
+            if kind == "navigation":
+                for page in fm.navigation.app_pages:
+                    self.pages[page.page_name] = page.page_script_hash
+            elif kind == "auto_rerun":
+                self.timers[fm.auto_rerun.fragment_id] = [fm.auto_rerun.interval, time.monotonic() + fm.auto_rerun.interval]
+            elif kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                el_kind = element.WhichOneof("type")
+                if el_kind == "exception":
+                    errors += 1
+                elif el_kind == "metric":
+                    metrics[element.metric.label] = element.metric.body
+                elif hasattr(getattr(element, el_kind), "id") and hasattr(getattr(element, el_kind), "label"):
+                    proto = getattr(element, el_kind)
+                    if el_kind == "checkbox" and proto.type == proto.StyleType.TOGGLE:
+                        el_kind = "toggle"
+                    widgets[tuple(fm.metadata.delta_path)] = RemoteWidget(self, el_kind, proto)
+        if not fragment_id:
+            self.widgets, self.metrics = widgets, metrics
+        return {"ms": (time.perf_counter() - started) * 1000, "bytes": received, "errors": errors}
+
+    async def think(self, seconds: float, record):
+        """Idle like a reader would, firing any fragment timers that come due meanwhile."""
+        until = time.monotonic() + seconds
+        while True:
+            due = min((t[1] for t in self.timers.values()), default=None)
+            if due is None or due > until:
+                await asyncio.sleep(max(0.0, until - time.monotonic()))
+                return
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            for fragment_id, timer in list(self.timers.items()):
+                if timer[1] <= time.monotonic():
+                    timer[1] = time.monotonic() + timer[0]
+                    record("timer", await self.run(fragment_id))
+
+
+def page_name(page_file: str) -> str:
+    """'7_Live_Status.py' -> 'Live Status', the name Streamlit's navigation uses."""
+    return re.sub(r"^\d+_", "", Path(page_file).stem).replace("_", " ")
+
+
+# ---------- server process ----------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _proc_status(pid: int) -> dict:
+    """VmRSS (MB) and Threads of a process, from /proc (empty off Linux)."""
+    try:
+        text = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return {}
+    fields = dict(line.split(":", 1) for line in text.splitlines() if ":" in line)
+    return {"rss_mb": int(fields["VmRSS"].split()[0]) / 1024, "threads": int(fields["Threads"])}
+
+
+class Sampler:
+    """Polls the server's RSS and thread count in the background; `peak()` since the last `reset()`."""
+
+    def __init__(self, pid: int, every: float = 0.2):
+        self.pid, self.every = pid, every
+        self._peak = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadgen-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.every):
+            now = _proc_status(self.pid)
+            for key, value in now.items():
+                self._peak[key] = max(self._peak.get(key, 0), value)
+
+    def reset(self):
+        self._peak = {}
+
+    def peak(self) -> dict:
+        return dict(self._peak)
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_server(env: dict, port: int, log_path: Path) -> subprocess.Popen:
+    """`streamlit run app.py` on `port`, once its health check answers. Its output goes to `log_path`."""
+    import requests
+
+    cmd = [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+           "--server.port", str(port), "--server.fileWatcherType", "none",
+           "--browser.gatherUsageStats", "false"]
+    # A file, not a pipe: nobody drains a pipe mid-run, and a full one blocks the server
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited {proc.returncode}: {log_path.read_text()[-2000:]}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not become healthy within 60 s")
+
+
+# ---------- one load level ----------
+async def user(i: int, url: str, pages: list, args, deadline: float, record, ready: asyncio.Event):
+    session = Session(url)
+    await asyncio.sleep(i * args.ramp_s / max(1, args.current))  # stagger the arrivals
+    try:
+        await session.connect()
+        rng = random.Random(i)
+        order = pages[i % len(pages):] + pages[:i % len(pages)]
+        while time.monotonic() < deadline:
+            for page in order:
+                if time.monotonic() >= deadline:
+                    break
+                record("open", await session.open(page_name(page)))
+                steps = list(SCENARIOS.get(page, []))
+                if args.auto_refresh and any(w.label == "Enable auto-refresh" for w in RemotePage(session).toggle):
+                    steps.insert(0, ("auto-refresh on", lambda at: next(
+                        w for w in at.toggle if w.label == "Enable auto-refresh").check()))
+                for name, action in steps:
+                    if time.monotonic() >= deadline:
+                        break
+                    await session.think(args.think_ms / 1000 * rng.uniform(0.5, 1.5), record)
+                    try:
+                        action(RemotePage(session))
+                    except (LookupError, StopIteration, IndexError) as e:
+                        record("error", {"error": f"{page} / {name}: {e}"})
+                        continue
+                    record("step", await session.run())
+        await ready.wait()  # stay connected until the Admin page has been read
+    except Exception as e:  # connection dropped, server overloaded, ...
+        record("error", {"error": f"session {i}: {type(e).__name__}: {e}"})
+    finally:
+        await session.close()
+
+
+async def admin_snapshot(url: str) -> dict:
+    session = Session(url)
+    try:
+        await session.connect()
+        if page_name(ADMIN_PAGE) not in session.pages:
+            return {}
+        await session.open(page_name(ADMIN_PAGE))
+        return session.metrics
+    finally:
+        await session.close()
+
+
+async def run_level(n: int, url: str, pages: list, args, sampler: Sampler, baseline_mb: float) -> dict:
+    runs, errors = [], []
+
+    def record(kind, result):
+        if kind == "error":
+            errors.append(result["error"])
+        else:
+            runs.append({"kind": kind, **result})
+
+    args.current = n
+    ready = asyncio.Event()
+    sampler.reset()
+    started = time.monotonic()
+    tasks = [asyncio.create_task(user(i, url, pages, args, started + args.duration, record, ready)) for i in range(n)]
+    await asyncio.sleep(args.duration)
+    admin = await admin_snapshot(url)
+    ready.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+
+    latencies = [r["ms"] for r in runs]
+    peak = sampler.peak()
+    return {
+        "sessions": n,
+        "reruns": len(runs),
+        "timer_reruns": sum(r["kind"] == "timer" for r in runs),
+        "reruns_per_s": round(len(runs) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) or 0, 1),
+        "p95_ms": round(_percentile(latencies, 95) or 0, 1),
+        "p99_ms": round(_percentile(latencies, 99) or 0, 1),
+        "max_ms": round(max(latencies, default=0), 1),
+        "kib_per_rerun": round(sum(r["bytes"] for r in runs) / max(1, len(runs)) / 1024, 1),
+        "runs_with_exceptions": sum(r["errors"] > 0 for r in runs),
+        "peak_rss_mb": round(peak.get("rss_mb", 0), 1),
+        "mb_per_session": round((peak.get("rss_mb", 0) - baseline_mb) / n, 2) if peak else None,
+        "peak_threads": peak.get("threads"),
+        "admin": admin,
+        "errors": sorted(set(errors))[:10],
+    }
+
+
+async def warm_up(url: str, pages: list):
+    session = Session(url)
+    try:
+        await session.connect()
+        for page in pages:
+            await session.open(page_name(page))
+    finally:
+        await session.close()
+
+
+def print_table(results, baseline_mb):
+    print(f"\nBaseline after warm-up: {baseline_mb:.0f} MB RSS")
+    header = (f"{'sessions':>8}{'reruns':>8}{'/s':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+              f"{'KiB/run':>9}{'exc':>5}{'RSS MB':>8}{'MB/sess':>8}{'threads':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['sessions']:>8}{r['reruns']:>8}{r['reruns_per_s']:>7.1f}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}"
+              f"{r['p99_ms']:>9.0f}{r['max_ms']:>9.0f}{r['kib_per_rerun']:>9.1f}{r['runs_with_exceptions']:>5}"
+              f"{r['peak_rss_mb']:>8.0f}{(r['mb_per_session'] or 0):>8.2f}{(r['peak_threads'] or 0):>8}")
+        if r["admin"]:
+            print(f"{'':>8}  admin: " + ", ".join(f"{k} {v}" for k, v in r["admin"].items()))
+        for err in r["errors"]:
+            print(f"{'':>8}  ! {err[:110]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of one app server against local API stubs.")
+    parser.add_argument("--sessions", default="1,5,10,25", help="concurrent sessions per level, e.g. 1,10,50")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="mean pause between clicks")
+    parser.add_argument("--ramp-s", type=float, default=5.0, help="spread session arrivals over this many seconds")
+    parser.add_argument("--pages", nargs="+", default=["all"], help="page files, e.g. 3_Pie.py (default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="dataset scale for the Visualization/Pie pages")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every stub API response")
+    parser.add_argument("--auto-refresh", action="store_true", help="turn on page auto-refresh and run its timers")
+    parser.add_argument("--save", metavar="NAME", help="save results as bench/baselines/NAME.json")
+    args = parser.parse_args(argv)
+
+    from bench.datasets import prepare
+    from bench.stub_server import StubAPI
+
+    pages = (sorted(p.name for p in PAGES_DIR.glob("*.py") if p.name != ADMIN_PAGE)
+             if args.pages == ["all"] else args.pages)
+    stub = StubAPI(latency=args.latency_ms / 1000).start()
+    results, baseline_mb = [], 0.0
+    with tempfile.TemporaryDirectory(prefix="loadgen-") as tmp:
+        env = {
+            **os.environ, **stub.env(), **prepare(args.scale),
+            "ARROW_CACHE_DIR": str(Path(tmp) / "arrow"),
+            "WEATHER_DB_PATH": str(Path(tmp) / "weather.sqlite"),
+            "SHARED_CACHE_URL": f"sqlite:///{Path(tmp) / 'shared_cache.sqlite'}",
+            "STREAMLIT_ADMIN": "1",
+        }
+        port = _free_port()
+        url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        server = start_server(env, port, Path(tmp) / "server.log")
+        sampler = Sampler(server.pid)
+        try:
+            print(f"[loadgen] server pid {server.pid} on port {port}; warming up ...", flush=True)
+            asyncio.run(warm_up(url, pages))
+            time.sleep(1)
+            baseline_mb = _proc_status(server.pid).get("rss_mb", 0.0)
+            for n in [int(s) for s in args.sessions.split(",")]:
+                print(f"[loadgen] {n} sessions for {args.duration:.0f} s ...", flush=True)
+                results.append(asyncio.run(run_level(n, url, pages, args, sampler, baseline_mb)))
+        finally:
+            sampler.stop()
+            server.terminate()
+            server.wait(timeout=30)
+            stub.stop()
+
+    print_table(results, baseline_mb)
+    if args.save:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f"{args.save}.json"
+        path.write_text(json.dumps({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "kind": "load",
+                                    "args": vars(args), "baseline_mb": baseline_mb, "results": results}, indent=1))
+        print(f"[loadgen] results saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Run every page headlessly and report rerun latency, peak memory and bytes sent.
+
+Each (page, scale) case runs in its own Python process, so caches, memory
+and imports start cold. The process loads the page with Streamlit's
+`AppTest`, times the first run, and then times `--reruns` reruns while
+clicking through that page's widgets (see SCENARIOS). All API traffic goes
+to the local stub server, and dataset scales only apply to the pages that
+read them (Visualization and Pie).
+
+Reported per case:
+- cold_ms: first run, including imports inside the page and data loading
+- p50/p95/p99_ms: widget-driven reruns
+- bytes_*: serialized size of the ForwardMsgs (deltas) the run sent to the browser
+- peak_rss_mb: peak resident memory of the process
+
+Baselines are plain JSON in bench/baselines/; `--compare` flags any metric
+that got worse by more than `--threshold` and exits non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+PAGES_DIR = ROOT / "pages"
+BASELINE_DIR = Path(__file__).parent / "baselines"
+SCALED_PAGES = {"2_Visualization.py", "3_Pie.py"}
+METRICS = ["cold_ms", "p50_ms", "p95_ms", "p99_ms", "bytes_cold", "bytes_per_rerun", "peak_rss_mb"]
+
+
+def _pick(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _full_range(at, label):
+    slider = _pick(at.sidebar.slider, label)
+    return slider.set_value((slider.min, slider.max))
+
+
+def _narrow_range(at, label):
+    slider = _pick(at.sidebar.slider, label)
+    span = slider.max - slider.min
+    return slider.set_value((slider.min + span / 4, slider.max - span / 4))
+
+
+# (step name, action) pairs, cycled through for the timed reruns
+SCENARIOS = {
+    "1_Bio.py": [
+        ("rerun", lambda at: None),
+    ],
+    "2_Visualization.py": [
+        ("tips: drop Sunday", lambda at: _pick(at.multiselect, "Filter by day").unselect("Sun")),
+        ("tips: lunch", lambda at: _pick(at.radio, "Meal time").set_value("Lunch")),
+        ("tips: dinner", lambda at: _pick(at.radio, "Meal time").set_value("Dinner")),
+        ("tips: all days", lambda at: _pick(at.multiselect, "Filter by day").select("Sun")),
+        ("gapminder", lambda at: _pick(at.radio, "Choose a dataset").set_value("Gapminder (world)")),
+        ("gapminder: 1952", lambda at: _pick(at.slider, "Pick a year").set_value(1952)),
+        ("gapminder: Europe", lambda at: _pick(at.selectbox, "Continent").set_value("Europe")),
+        ("gapminder: all", lambda at: _pick(at.selectbox, "Continent").set_value("All")),
+        ("gapminder: 2007", lambda at: _pick(at.slider, "Pick a year").set_value(2007)),
+        ("tips", lambda at: _pick(at.radio, "Choose a dataset").set_value("Tips (restaurant)")),
+    ],
+    "3_Pie.py": [
+        ("viridis", lambda at: _pick(at.selectbox, "Color Scheme").set_value("Viridis")),
+        ("donut", lambda at: _pick(at.slider, "Donut Hole Size (0 = full pie, 0.5 = donut)").set_value(0.3)),
+        ("top 5", lambda at: _pick(at.slider, 'Slices to show (the rest become "Other")').set_value(5)),
+        ("labels only", lambda at: _pick(at.checkbox, "Show Percentages").uncheck()),
+        ("plotly colors", lambda at: _pick(at.selectbox, "Color Scheme").set_value("Plotly")),
+        ("full pie", lambda at: _pick(at.slider, "Donut Hole Size (0 = full pie, 0.5 = donut)").set_value(0.0)),
+        ("top 10", lambda at: _pick(at.slider, 'Slices to show (the rest become "Other")').set_value(10)),
+        ("percentages", lambda at: _pick(at.checkbox, "Show Percentages").check()),
+    ],
+    "4_CoinGecko.py": [
+        ("add solana", lambda at: _pick(at.multiselect, "Coins to track").select("solana")),
+        ("add cardano", lambda at: _pick(at.multiselect, "Coins to track").select("cardano")),
+        ("rerun", lambda at: None),
+        ("drop solana", lambda at: _pick(at.multiselect, "Coins to track").unselect("solana")),
+        ("drop cardano", lambda at: _pick(at.multiselect, "Coins to track").unselect("cardano")),
+    ],
+    "5_OpenMeteo.py": [
+        ("add Boulder", lambda at: _pick(at.sidebar.multiselect, "Locations").select("Boulder")),
+        ("30 days", lambda at: _pick(at.slider, "History to chart (days)").set_value(30)),
+        ("focus Boulder", lambda at: _pick(at.sidebar.selectbox, "Focus location").set_value("Boulder")),
+        ("7 days", lambda at: _pick(at.slider, "History to chart (days)").set_value(7)),
+        ("focus Denver", lambda at: _pick(at.sidebar.selectbox, "Focus location").set_value("Denver")),
+        ("drop Boulder", lambda at: _pick(at.sidebar.multiselect, "Locations").unselect("Boulder")),
+    ],
+    "7_Live_Status.py": [
+        ("add solana", lambda at: _pick(at.sidebar.multiselect, "Coins").select("solana")),
+        ("add Boulder", lambda at: _pick(at.sidebar.multiselect, "Locations").select("Boulder")),
+        ("refresh", lambda at: None),
+        ("drop solana", lambda at: _pick(at.sidebar.multiselect, "Coins").unselect("solana")),
+        ("drop Boulder", lambda at: _pick(at.sidebar.multiselect, "Locations").unselect("Boulder")),
+    ],
+    "6_Dashboard.py": [
+        ("narrow hours", lambda at: _narrow_range(at, "Hours studied")),
+        ("narrow sleep", lambda at: _narrow_range(at, "Sleep (hrs/night)")),
+        ("all hours", lambda at: _full_range(at, "Hours studied")),
+        ("all sleep", lambda at: _full_range(at, "Sleep (hrs/night)")),
+    ],
+}
+
+
+# ---------- worker (one case, one process) ----------
+def _count_sent_bytes():
+    """Record the serialized size of every run's ForwardMsgs; returns the list it appends to."""
+    from streamlit.testing.v1 import local_script_runner
+
+    sent = []
+    forward_msgs = local_script_runner.LocalScriptRunner.forward_msgs
+
+    def counting(self):
+        msgs = forward_msgs(self)
+        sent.append(sum(m.ByteSize() for m in msgs))
+        return msgs
+
+    local_script_runner.LocalScriptRunner.forward_msgs = counting
+    return sent
+
+
+def _percentile(values, q):
+    import numpy as np
+    return float(np.percentile(values, q)) if values else None
+
+
+def run_case(page: str, scale: int, reruns: int, timeout: float) -> dict:
+    sys.path.insert(0, str(ROOT))  # pages import `utils.*`, as they do under app.py
+    from streamlit.testing.v1 import AppTest
+
+    sent = _count_sent_bytes()
+    errors = []
+    at = AppTest.from_file(str(PAGES_DIR / page), default_timeout=timeout)
+
+    t0 = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - t0) * 1000
+    bytes_cold = sent[-1] if sent else 0
+    errors += [e.value for e in at.exception]
+
+    steps = SCENARIOS.get(page, [("rerun", lambda at: None)])
+    latencies, rerun_bytes = [], []
+    for i in range(reruns):
+        name, action = steps[i % len(steps)]
+        try:
+            action(at)
+        except Exception as e:  # widget missing (e.g. page errored): still time a plain rerun
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+        t0 = time.perf_counter()
+        at.run()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        rerun_bytes.append(sent[-1] if sent else 0)
+        errors += [f"{name}: {e.value}" for e in at.exception]
+
+    return {
+        "page": page,
+        "scale": scale,
+        "reruns": reruns,
+        "cold_ms": round(cold_ms, 1),
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "bytes_cold": bytes_cold,
+        "bytes_per_rerun": round(sum(rerun_bytes) / len(rerun_bytes)) if rerun_bytes else 0,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024), 1),
+        "errors": sorted(set(errors))[:10],
+    }
+
+
+# ---------- driver ----------
+def _spawn(page, scale, args, env):
+    cmd = [sys.executable, "-m", "bench.run", "--worker", page, "--scale", str(scale),
+           "--reruns", str(args.reruns), "--timeout", str(args.timeout)]
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+    return {"page": page, "scale": scale, "errors": [f"worker exited {proc.returncode}"] + tail}
+
+
+def run_suite(args) -> list:
+    from bench.datasets import prepare
+    from bench.stub_server import StubAPI
+
+    pages = sorted(p.name for p in PAGES_DIR.glob("*.py")) if args.pages == ["all"] else args.pages
+    stub = StubAPI(latency=args.latency_ms / 1000).start()
+    results = []
+    try:
+        for scale in args.scales:
+            data_env = prepare(scale)
+            for page in pages:
+                if scale != args.scales[0] and page not in SCALED_PAGES:
+                    continue  # unscaled pages only need one pass
+                with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+                    env = {
+                        **os.environ, **stub.env(), **data_env,
+                        # fresh on-disk caches per case, so cold_ms really is cold
+                        "ARROW_CACHE_DIR": str(Path(tmp) / "arrow"),
+                        "WEATHER_DB_PATH": str(Path(tmp) / "weather.sqlite"),
+                        "SHARED_CACHE_URL": f"sqlite:///{Path(tmp) / 'shared_cache.sqlite'}",
+                    }
+                    print(f"[bench] {page} x{scale} ...", flush=True)
+                    results.append(_spawn(page, scale, args, env))
+    finally:
+        stub.stop()
+    return results
+
+
+def _fmt_bytes(n):
+    return f"{n / 1024:,.1f} KiB" if n is not None else "-"
+
+
+def print_table(results):
+    header = f"{'page':<22}{'scale':>7}{'cold ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sent cold':>13}{'sent/rerun':>13}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "p50_ms" not in r:
+            print(f"{r['page']:<22}{r['scale']:>7}  FAILED: {r['errors']}")
+            continue
+        print(f"{r['page']:<22}{r['scale']:>7}{r['cold_ms']:>10.0f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{_fmt_bytes(r['bytes_cold']):>13}{_fmt_bytes(r['bytes_per_rerun']):>13}{r['peak_rss_mb']:>9.0f}")
+        for err in r["errors"]:
+            print(f"{'':<29}! {err[:100]}")
+
+
+def save_baseline(name, results, args):
+    import streamlit
+
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    path.write_text(json.dumps({
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "machine": platform.platform(),
+        "reruns": args.reruns,
+        "results": results,
+    }, indent=1))
+    print(f"[bench] baseline saved to {path}")
+
+
+def compare(name, results, threshold) -> int:
+    """Print metric deltas against baseline `name`; return the number of regressions."""
+    baseline = json.loads((BASELINE_DIR / f"{name}.json").read_text())
+    before = {(r["page"], r["scale"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nCompared with baseline '{name}' ({baseline['created']}); flagging > {threshold:.0%} worse")
+    for r in results:
+        old = before.get((r["page"], r["scale"]))
+        if old is None or "p50_ms" not in r or "p50_ms" not in old:
+            continue
+        deltas = []
+        for metric in METRICS:
+            if not old.get(metric):
+                continue
+            change = r[metric] / old[metric] - 1
+            flag = change > threshold
+            regressions += flag
+            deltas.append(f"{metric} {change:+.0%}{' !' if flag else ''}")
+        print(f"{r['page']:<22}{r['scale']:>7}  " + ", ".join(deltas))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every page's hot path against local API stubs.")
+    parser.add_argument("--pages", nargs="+", default=["all"], help="page files, e.g. 3_Pie.py (default: all)")
+    parser.add_argument("--scales", default="1,100", help="dataset scales, e.g. 1,100,10000")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-run AppTest timeout (s)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every stub API response")
+    parser.add_argument("--save", metavar="NAME", help="save results as bench/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare with bench/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown counted as a regression")
+    parser.add_argument("--worker", metavar="PAGE", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print("RESULT " + json.dumps(run_case(args.worker, args.scale, args.reruns, args.timeout)), flush=True)
+        return 0
+
+    args.scales = [int(s) for s in args.scales.split(",")]
+    results = run_suite(args)
+    print()
+    print_table(results)
+    if args.save:
+        save_baseline(args.save, results, args)
+    if args.compare:
+        return 1 if compare(args.compare, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
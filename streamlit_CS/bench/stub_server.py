@@ -0,0 +1,143 @@
+"""Local stand-in for api.coingecko.com and api.open-meteo.com.
+
+Serves the recorded responses in bench/fixtures/ so benchmarks never touch
+the real APIs (or their rate limits):
+
+- /api/v3/coins/list            -> coingecko_coins_list.json
+- /api/v3/simple/price?ids=...  -> the requested ids from coingecko_simple_price.json,
+                                   nudged a little per request so the history charts move
+- /v1/forecast?latitude=...     -> open_meteo_forecast.json once per coordinate, with the
+                                   hourly series re-aligned to the current hour and cut
+                                   to `past_hours`
+
+Point the app at it with COINGECKO_API_BASE / OPEN_METEO_API_BASE (see `env()`).
+Run standalone with `python -m bench.stub_server --port 8765`.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _load(name):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+class StubAPI:
+    """Threaded HTTP server on localhost; `latency` (seconds) is added to every response."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.requests = 0
+        self._coins = _load("coingecko_coins_list.json")
+        self._prices = _load("coingecko_simple_price.json")
+        self._forecast = _load("open_meteo_forecast.json")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def env(self) -> dict:
+        """Environment variables that point the app at this server."""
+        return {
+            "COINGECKO_API_BASE": f"{self.url}/api/v3",
+            "OPEN_METEO_API_BASE": f"{self.url}/v1",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------- responses ----------
+    def respond(self, path: str, query: dict):
+        """Return (status, body) for one request."""
+        with self._lock:
+            self.requests += 1
+        if path == "/api/v3/coins/list":
+            return 200, self._coins
+        if path == "/api/v3/simple/price":
+            ids = query.get("ids", [""])[0].split(",")
+            vs = query.get("vs_currencies", ["usd"])[0]
+            with self._lock:
+                return 200, {
+                    coin: {vs: round(self._prices[coin]["usd"] * (1 + self._rng.uniform(-0.005, 0.005)), 6)}
+                    for coin in ids if coin in self._prices
+                }
+        if path == "/v1/forecast":
+            lats = query["latitude"][0].split(",")
+            lons = query["longitude"][0].split(",")
+            past_hours = int(query.get("past_hours", ["168"])[0])
+            items = [self._location(float(lat), float(lon), past_hours) for lat, lon in zip(lats, lons)]
+            return 200, items[0] if len(items) == 1 else items
+        return 404, {"error": f"no stub for {path}"}
+
+    def _location(self, lat, lon, past_hours):
+        hourly = self._forecast["hourly"]
+        n = len(hourly["time"])
+        now = int(time.time()) // 3600 * 3600
+        times = list(range(now - past_hours * 3600, now + 2 * 3600, 3600))  # + forecast_hours=1
+        # Recorded values repeat when more history is asked for than was recorded
+        offset = n - len(times) % n
+        pick = lambda values: [values[(offset + i) % n] for i in range(len(times))]
+        return {
+            **self._forecast,
+            "latitude": lat,
+            "longitude": lon,
+            "current": {**self._forecast["current"], "time": now + 900},
+            "hourly": {
+                "time": times,
+                "temperature_2m": pick(hourly["temperature_2m"]),
+                "wind_speed_10m": pick(hourly["wind_speed_10m"]),
+            },
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, payload = stub.respond(url.path, parse_qs(url.query))
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # keep benchmark output clean
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    stub = StubAPI(port=args.port, latency=args.latency_ms / 1000).start()
+    for key, value in stub.env().items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -1,6 +1,12 @@
 import streamlit as st
 from pathlib import Path
 
+from utils import profiler
+from utils.assets import build_all, picture_html, variant_path
+
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("1_Bio")
+
 st.title("👋 My Bio")
 
 # ---------- TODO: Replace with your own info ----------
@@ -19,12 +25,24 @@ FUN_FACTS = [
 # this was an AI solution since the image would not appear as I tried several different approaches to resolve the issue
 PHOTO_PATH = Path(__file__).parent.parent / "assets" / "headshot.jpeg"
 
+# Responsive, pre-sized copies of the photo (built once per process into static/img)
+@st.cache_resource
+def image_manifest():
+    return build_all([PHOTO_PATH.name])
+
 # ---------- Layout ----------
 col1, col2 = st.columns([1, 2], vertical_alignment="center")
 
 with col1:
     try:
-        st.image(PHOTO_PATH, caption=NAME, use_container_width=True)
+        entry = image_manifest()[PHOTO_PATH.name]
+        with prof.phase("photo"):
+            if st.get_option("server.enableStaticServing"):
+                # The browser picks the smallest variant that fits the column (~240px, or full width on phones)
+                st.markdown(picture_html(entry, NAME, sizes="(max-width: 640px) 100vw, 240px"), unsafe_allow_html=True)
+                st.caption(NAME)
+            else:
+                st.image(str(variant_path(entry, 480)), caption=NAME, use_container_width=True)
     except Exception as e:
         # Attempting to see what was actually happening with image viewing issue
         st.error(f"Could not load image: {e}")
@@ -40,3 +58,4 @@ for i, f in enumerate(FUN_FACTS, start=1):
 
 st.divider()
 st.caption("Edit `pages/1_Bio.py` to customize this page.")
+prof.finish()
@@ -1,6 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
+
+from utils import profiler
+from utils.datasets import load_bundled
+from utils.figure_cache import FigureCache
+from utils.filter_index import FilterIndex
+from utils.paged_table import paged_table, view_for
+from utils.point_budget import DENSITY_THRESHOLD, WEBGL_THRESHOLD, density_figure, scatter_mode
+
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("2_Visualization")
 
 st.title("📊 Simple Interactive Visualization")
 
@@ -18,43 +28,90 @@ dataset = st.radio(
     horizontal=True
 )
 
-@st.cache_data
+# Datasets are converted to Arrow once and memory-mapped; cache_resource shares
+# that one frame with every session instead of pickling a copy for each.
+# TIPS_DATA_PATH / GAPMINDER_DATA_PATH can point at bigger CSV exports with the same columns
+@profiler.tracked(st.cache_resource)
 def load_tips():
-    return px.data.tips()
+    return load_bundled("tips")
 
-@st.cache_data
+@profiler.tracked(st.cache_resource)
 def load_gapminder():
-    return px.data.gapminder()
+    return load_bundled("gapminder")
+
+# Filter indexes are built once per dataset, so widget changes become lookups, not scans
+@profiler.tracked(st.cache_resource)
+def tips_index():
+    return FilterIndex(load_tips(), ["day", "time"])
+
+@profiler.tracked(st.cache_resource)
+def gapminder_index():
+    return FilterIndex(load_gapminder(), ["year", "continent"])
+
+# Built figures, keyed on (dataset, filter values), shared by every session
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+# Point budget: SVG for small views, WebGL for big ones, a server-binned density map for huge ones
+with st.sidebar.expander("⚙️ Chart performance"):
+    webgl_threshold = st.number_input("WebGL above (points)", min_value=0, value=WEBGL_THRESHOLD, step=1000)
+    density_threshold = st.number_input("Density map above (points)", min_value=1, value=DENSITY_THRESHOLD, step=10000)
 
 # ----------------- Tips Example -----------------
 if dataset == "Tips (restaurant)":
-    df = load_tips()
-    st.write("**Columns:**", list(df.columns))
+    with prof.phase("load data"):
+        df = load_tips()
+        index = tips_index()
+    st.caption(view_for(df).summary())
 
     # TODO 1: add one widget (e.g., filter by day)
-    days = sorted(df["day"].unique())
+    days = index.values("day")
     chosen_days = st.multiselect("Filter by day", options=days, default=days)
 
     # Optional second widget
-    meal = st.radio("Meal time", options=sorted(df["time"].unique()), index=1)
+    meal = st.radio("Meal time", options=index.values("time"), index=1)
 
     # Filter
-    filtered = df.query("day in @chosen_days and time == @meal")
+    with prof.phase("filter"):
+        filtered = index.select(day=chosen_days, time=meal)
 
     # Chart
     st.markdown("#### Scatter: Total Bill vs Tip")
     if filtered.empty:
         st.warning("No rows match your filters.")
     else:
-        fig = px.scatter(
-            filtered,
-            x="total_bill", y="tip",
-            color="sex", size="size",
-            hover_data=["day", "smoker"],
-            labels={"total_bill": "Total Bill ($)", "tip": "Tip ($)"},
-            title=f"Tips: {meal} · {', '.join(chosen_days)}"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        mode = scatter_mode(len(filtered), webgl_threshold, density_threshold)
+        labels = {"total_bill": "Total Bill ($)", "tip": "Tip ($)"}
+        title = f"Tips: {meal} · {', '.join(chosen_days)}"
+
+        def build_tips():
+            import plotly.express as px  # only paid for when a figure is actually built
+
+            if mode == "density":
+                return density_figure(filtered["total_bill"], filtered["tip"], labels=labels,
+                                      x_name="total_bill", y_name="tip", title=title)
+            return px.scatter(
+                filtered,
+                x="total_bill", y="tip",
+                color="sex", size="size",
+                hover_data=["day", "smoker"],
+                labels=labels,
+                title=title,
+                render_mode="webgl" if mode == "webgl" else "svg",
+            )
+
+        # Rebuilt only for a filter combination not seen before
+        with prof.phase("build figure"):
+            fig = figure_cache().get(("tips", tuple(chosen_days), meal, mode), build_tips)
+        with prof.phase("send chart"):
+            st.plotly_chart(fig, use_container_width=True)
+        if mode != "svg":
+            st.caption(f"{len(filtered):,} points: drawn as {'WebGL' if mode == 'webgl' else 'a density map'}.")
+
+    # Rows are paged on the server; only the visible page is sent
+    with st.expander("📋 Browse rows"):
+        paged_table(df, key="tips_rows")
 
     # Help text
     with st.expander("How to read this chart"):
@@ -68,33 +125,96 @@ if dataset == "Tips (restaurant)":
 
 # ----------------- Gapminder Example -----------------
 else:
-    df = load_gapminder()
-    st.write("**Columns:**", list(df.columns))
+    with prof.phase("load data"):
+        df = load_gapminder()
+        index = gapminder_index()
+    st.caption(view_for(df).summary())
 
-    year_min, year_max = int(df["year"].min()), int(df["year"].max())
-    year = st.slider("Pick a year", min_value=year_min, max_value=year_max, value=2007, step=5)
+    years = index.values("year")
+    year_min, year_max = int(years[0]), int(years[-1])
+    playback = st.toggle("▶️ Playback mode (animate every year in the browser)", value=False)
+    if not playback:
+        year = st.slider("Pick a year", min_value=year_min, max_value=year_max, value=2007, step=5)
 
     # TODO 2: choose continent or 'All'
-    continents = ["All"] + sorted(df["continent"].unique())
+    continents = ["All"] + index.values("continent")
     continent = st.selectbox("Continent", options=continents, index=0)
 
-    view = df[df["year"] == year]
-    if continent != "All":
-        view = view[view["continent"] == continent]
-
+    labels = {"gdpPercap": "GDP per Capita (USD)", "lifeExp": "Life Expectancy (years)"}
     st.markdown("#### Bubble chart: GDP per capita vs Life Expectancy")
-    if view.empty:
-        st.warning("No data for this selection.")
+    if playback:
+        # Every year is a frame of one figure: the browser plays and scrubs it with
+        # no server round-trips, and the figure is built once per continent
+        frames = df if continent == "All" else index.select(continent=continent)
+        mode = scatter_mode(len(frames) // max(1, len(years)), webgl_threshold, density_threshold)
+        title = f"{year_min}–{year_max} — {continent if continent!='All' else 'All continents'}"
+
+        def build_playback():
+            import plotly.express as px
+
+            # Axis ranges and bubble scale come from all years, so nothing jumps between frames
+            gdp = np.log10(frames["gdpPercap"].to_numpy(dtype=float))
+            life = frames["lifeExp"].to_numpy(dtype=float)
+            fig = px.scatter(
+                frames.sort_values("year", kind="stable"),  # frames play in year order
+                x="gdpPercap", y="lifeExp",
+                size="pop", color="continent", hover_name="country",
+                animation_frame="year", animation_group="country",
+                size_max=50, log_x=True,
+                range_x=[10 ** (np.nanmin(gdp) - 0.1), 10 ** (np.nanmax(gdp) + 0.1)],
+                range_y=[np.nanmin(life) - 5, np.nanmax(life) + 5],
+                labels=labels,
+                title=title,
+                render_mode="webgl" if mode == "webgl" else "svg",
+            )
+            fig.layout.updatemenus[0].buttons[0].args[1]["frame"]["duration"] = 600
+            return fig
+
+        if mode == "density":
+            st.info(f"Too many points per year to animate ({len(frames) // len(years):,}); "
+                    "turn playback off to see one year as a density map.")
+        else:
+            with prof.phase("build figure"):
+                fig = figure_cache().get(("gapminder-playback", continent, mode), build_playback)
+            with prof.phase("send chart"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{len(years)} years, {len(frames):,} points in total: press ▶ to play.")
     else:
-        fig = px.scatter(
-            view,
-            x="gdpPercap", y="lifeExp",
-            size="pop", color="continent", hover_name="country",
-            size_max=50, log_x=True,
-            labels={"gdpPercap": "GDP per Capita (USD)", "lifeExp": "Life Expectancy (years)"},
-            title=f"{year} — {continent if continent!='All' else 'All continents'}"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with prof.phase("filter"):
+            view = index.select(year=year, continent=None if continent == "All" else continent)
+
+        if view.empty:
+            st.warning("No data for this selection.")
+        else:
+            mode = scatter_mode(len(view), webgl_threshold, density_threshold)
+            title = f"{year} — {continent if continent!='All' else 'All continents'}"
+
+            def build_gapminder():
+                import plotly.express as px
+
+                if mode == "density":
+                    return density_figure(view["gdpPercap"], view["lifeExp"], log_x=True, labels=labels,
+                                          x_name="gdpPercap", y_name="lifeExp", title=title)
+                return px.scatter(
+                    view,
+                    x="gdpPercap", y="lifeExp",
+                    size="pop", color="continent", hover_name="country",
+                    size_max=50, log_x=True,
+                    labels=labels,
+                    title=title,
+                    render_mode="webgl" if mode == "webgl" else "svg",
+                )
+
+            # Rebuilt only for a year/continent combination not seen before
+            with prof.phase("build figure"):
+                fig = figure_cache().get(("gapminder", year, continent, mode), build_gapminder)
+            with prof.phase("send chart"):
+                st.plotly_chart(fig, use_container_width=True)
+            if mode != "svg":
+                st.caption(f"{len(view):,} points: drawn as {'WebGL' if mode == 'webgl' else 'a density map'}.")
+
+    with st.expander("📋 Browse rows"):
+        paged_table(df, key="gapminder_rows")
 
     with st.expander("How to read this chart"):
         st.write(
@@ -106,3 +226,4 @@ else:
 
 st.divider()
 st.caption("Edit `pages/2_Visualization.py` to finish your interactive viz.")
+prof.finish()
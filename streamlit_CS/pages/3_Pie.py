@@ -1,8 +1,18 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from plotly import colors
+import os
 from pathlib import Path
 
+from utils import profiler
+from utils.csv_aggregate import LARGE_FILE_BYTES, aggregate_csv, top_n_with_other
+from utils.datasets import read_csv_columnar
+from utils.file_cache import FileCache
+from utils.figure_cache import FigureCache, data_fingerprint, patch_figure
+from utils.paged_table import paged_table, view_for
+
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("3_Pie")
+
 st.title("🥧 Pie Chart Visualization")
 
 st.markdown(
@@ -12,14 +22,30 @@ st.markdown(
     """
 )
 
+# Get absolute path to the data folder (PIE_DATA_PATH can point at a bigger export)
+DATA_PATH = Path(os.environ.get("PIE_DATA_PATH", Path(__file__).parent.parent / "data" / "pie_demo.csv"))
+
+# Parsed data is cached per file version (path + mtime + size), and a watcher
+# re-parses in the background as soon as the CSV is edited. The raw frame is
+# also kept as a memory-mapped Arrow file so new server processes skip the CSV parse
+@st.cache_resource
+def pie_caches():
+    """(raw CSV cache, aggregate cache) shared by every session."""
+    return FileCache(read_csv_columnar), FileCache(aggregate_csv)
+
+raw_cache, aggregate_cache = pie_caches()
+
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
 # Load the CSV file using absolute path
-@st.cache_data
 def load_pie_data():
     """Load pie chart data from CSV file in the data folder."""
-    # Get absolute path to the data folder
-    data_path = Path(__file__).parent.parent / "data" / "pie_demo.csv"
+    data_path = DATA_PATH
     try:
-        df = pd.read_csv(data_path)
+        df = raw_cache.get(data_path)
+        raw_cache.watch(data_path)
         return df
     except FileNotFoundError:
         st.error(f"Could not find file at: {data_path}")
@@ -28,15 +54,46 @@ def load_pie_data():
         st.error(f"Error loading data: {e}")
         return None
 
-# Load the data
-df = load_pie_data()
+def aggregate_pie_data():
+    """Single streaming pass: per-category totals (largest first) and the statistics block."""
+    data_path = DATA_PATH
+    try:
+        result = aggregate_cache.get(data_path)
+        aggregate_cache.watch(data_path)
+        return result
+    except FileNotFoundError:
+        st.error(f"Could not find file at: {data_path}")
+    except Exception as e:
+        st.error(f"Error aggregating data: {e}")
+    return None, None
+
+def fmt(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+# Small files are loaded whole (raw data view); large ones only ever stream
+large_file = DATA_PATH.exists() and DATA_PATH.stat().st_size > LARGE_FILE_BYTES
+large_mode = st.toggle("Large-CSV mode (stream + aggregate, no raw view)", value=large_file)
+top_n = st.slider("Slices to show (the rest become \"Other\")", min_value=3, max_value=30, value=10)
+
+with prof.phase("aggregate"):
+    totals, stats = aggregate_pie_data()
+
+if stats is not None:
+    with prof.phase("top n"):
+        df = top_n_with_other(totals, top_n)
 
-if df is not None:
     # Display the raw data
     with st.expander("📋 View Raw Data"):
-        st.dataframe(df, use_container_width=True)
-        st.write(f"**Total rows:** {len(df)}")
-        st.write(f"**Columns:** {list(df.columns)}")
+        if large_mode:
+            st.write(f"Raw view is off in large-CSV mode ({stats['rows']:,} rows).")
+        else:
+            with prof.phase("load raw data"):
+                raw_df = load_pie_data()
+            if raw_df is not None:
+                # Only the visible page is sent; sort/filter run here against the cached frame
+                with prof.phase("send raw table"):
+                    paged_table(raw_df, key="pie_raw")
+                st.caption(view_for(raw_df).summary())
     
     # Add interactive controls
     st.markdown("### Chart Customization")
@@ -69,60 +126,72 @@ if df is not None:
     
     # Map color scheme names to plotly color sequences
     color_map = {
-        "Plotly": px.colors.qualitative.Plotly,
-        "Viridis": px.colors.sequential.Viridis,
-        "Plasma": px.colors.sequential.Plasma,
-        "Inferno": px.colors.sequential.Inferno,
-        "Magma": px.colors.sequential.Magma,
-        "Cividis": px.colors.sequential.Cividis
+        "Plotly": colors.qualitative.Plotly,
+        "Viridis": colors.sequential.Viridis,
+        "Plasma": colors.sequential.Plasma,
+        "Inferno": colors.sequential.Inferno,
+        "Magma": colors.sequential.Magma,
+        "Cividis": colors.sequential.Cividis
     }
     
-    fig = px.pie(
-        df,
-        names="Category",
-        values="Value",
-        title="Distribution by Category",
-        hole=hole_size,
-        color_discrete_sequence=color_map[color_scheme]
-    )
-    
-    # Update layout for better appearance
-    fig.update_traces(
-        textposition='inside',
-        textinfo='percent+label' if show_percentages else 'label',
-        hovertemplate='<b>%{label}</b><br>Value: %{value}<br>Percentage: %{percent}<extra></extra>'
-    )
-    
-    fig.update_layout(
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="middle",
-            y=0.5,
-            xanchor="left",
-            x=1.05
+    # The pie itself is only rebuilt when the data changes; color scheme,
+    # hole size and labels are patched onto the cached figure
+    def build_pie():
+        import plotly.express as px  # only paid for when the pie is actually rebuilt
+
+        fig = px.pie(
+            df,
+            names="Category",
+            values="Value",
+            title="Distribution by Category",
+        )
+
+        # Update layout for better appearance
+        fig.update_traces(
+            textposition='inside',
+            hovertemplate='<b>%{label}</b><br>Value: %{value}<br>Percentage: %{percent}<extra></extra>'
+        )
+
+        fig.update_layout(
+            showlegend=True,
+            legend=dict(
+                orientation="v",
+                yanchor="middle",
+                y=0.5,
+                xanchor="left",
+                x=1.05
+            )
+        )
+        return fig
+
+    with prof.phase("build figure"):
+        base = figure_cache().get(("pie", data_fingerprint(df)), build_pie)
+        fig = patch_figure(
+            base,
+            layout={"piecolorway": color_map[color_scheme]},
+            all_traces={"hole": hole_size, "textinfo": 'percent+label' if show_percentages else 'label'},
         )
-    )
     
-    st.plotly_chart(fig, use_container_width=True)
+    with prof.phase("send chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
     # Statistics section
     st.markdown("### 📊 Statistics")
     
     col1, col2, col3 = st.columns(3)
     
+    # All figures come from the same aggregation pass as the chart
     with col1:
-        st.metric("Total Value", f"{df['Value'].sum()}")
+        st.metric("Total Value", fmt(stats["total"]))
     
     with col2:
-        st.metric("Average Value", f"{df['Value'].mean():.2f}")
+        st.metric("Average Value", f"{stats['mean']:.2f}")
     
     with col3:
-        st.metric("Categories", len(df))
+        st.metric("Categories", stats["categories"])
     
     # Top category
-    top_category = df.loc[df['Value'].idxmax()]
-    st.info(f"🏆 **Top Category:** {top_category['Category']} with a value of {top_category['Value']}")
+    st.info(f"🏆 **Top Category:** {stats['top_category']} with a value of {fmt(stats['top_value'])}")
     
     # Help section
     with st.expander("ℹ️ How to use this chart"):
@@ -138,4 +207,5 @@ if df is not None:
         )
 
 st.divider()
-st.caption("Data loaded from `data/pie_demo.csv` • Edit `pages/3_Pie.py` to customize this page.")
+st.caption(f"Data loaded from `{DATA_PATH.name}` • Edit `pages/3_Pie.py` to customize this page.")
+prof.finish()
@@ -1,9 +1,21 @@
 # Step 1 - Read API once
 import streamlit as st
 import pandas as pd
-import requests
-import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import math
 import time
+from functools import partial
+
+from utils import profiler
+from utils.figure_cache import FigureCache, patch_figure
+from utils.http_client import get_client
+from utils.paged_table import paged_table
+from utils.coingecko import VS, fetch_coin_list, fetch_prices_batched
+from utils.refresher import get_poller
+from utils.shared_cache import get_backend, remember
+from utils.ring_buffer import PriceHistory
+from utils.swr_cache import StaleWhileRevalidateCache
 
 st.set_page_config(page_title="Live API Demo (Simple)", page_icon="📡", layout="wide")
 # Disable fade/transition so charts don't blink between reruns
@@ -16,18 +28,41 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("4_CoinGecko")
+
 st.title("📡 Simple Live Data Demo (CoinGecko)")
 st.caption("Friendly demo with manual refresh + fallback data so it never crashes.")
 
 #Step 2 - Config
-COINS = ["bitcoin", "ethereum"]
-VS = "usd"
-HEADERS = {"User-Agent": "msudenver-dataviz-class/1.0", "Accept": "application/json"}
-
-def build_url(ids):
-    return f"https://api.coingecko.com/api/v3/simple/price?ids={','.join(ids)}&vs_currencies={VS}"
-
-API_URL = build_url(COINS)
+DEFAULT_COINS = ["bitcoin", "ethereum"]
+MAX_SPARKLINES = 24  # small multiples drawn at most; the % change view covers every coin
+
+@profiler.tracked(st.cache_data(ttl=24 * 3600, show_spinner=False))  # Coin list changes rarely: once a day
+def coin_list():
+    """Return (df of id/symbol/name, error_message) for every listed coin."""
+    # Shared with the other replicas, so the list is fetched once a day in total
+    return remember("coingecko-coins", 24 * 3600, fetch_coin_list)
+
+with prof.phase("coin list"):
+    coins_df, coins_err = coin_list()
+if coins_err:
+    coin_list.clear()  # don't keep an error around for a whole day
+    st.caption(f"Coin list unavailable ({coins_err}); only the default coins can be picked.")
+    coin_labels = {}
+else:
+    coin_labels = dict(zip(coins_df["id"], coins_df["name"] + " (" + coins_df["symbol"].str.upper() + ")"))
+
+COINS = st.multiselect(
+    "Coins to track",
+    options=list(coin_labels) or DEFAULT_COINS,
+    default=DEFAULT_COINS,
+    format_func=lambda c: coin_labels.get(c, c),
+)
+if not COINS:
+    st.info("Pick at least one coin to track.")
+    st.stop()
+CACHE_KEY = ",".join(sorted(COINS))  # one cache entry / poller per set of coins
 
 # Tiny sample to keep the demo working even if the API is rate-limiting
 SAMPLE_DF = pd.DataFrame(
@@ -35,22 +70,39 @@ SAMPLE_DF = pd.DataFrame(
 )
 
 #Step 3 - FETCH (CACHED)
-@st.cache_data(ttl=300, show_spinner=False)   # Cache for 5 minutes
-
-def fetch_prices(url: str):
-    """Return (df, error_message). Never raise. Safe for beginners."""
-    try:
-        resp = requests.get(url, timeout=10, headers=HEADERS)
-        # Handle 429 and other non-200s
-        if resp.status_code == 429:
-            retry_after = resp.headers.get("Retry-After", "a bit")
-            return None, f"429 Too Many Requests — try again after {retry_after}s"
-        resp.raise_for_status()
-        data = resp.json()
-        df = pd.DataFrame(data).T.reset_index().rename(columns={"index": "coin"})
-        return df, None
-    except requests.RequestException as e:
-        return None, f"Network/HTTP error: {e}"
+@st.cache_resource
+def price_cache():
+    """Last-known-good cache shared by every session: fresh for 5 minutes, still shown for up to 1 hour.
+
+    Prices are also shared with other replicas through the shared cache backend."""
+    return StaleWhileRevalidateCache(ttl=300, max_stale=3600, backend=get_backend(),
+                                     namespace="coingecko-prices", on_shared=record_shared_prices)
+
+@st.cache_resource
+def price_history():
+    """Rolling per-coin price history shared by every session (last 720 polls per coin)."""
+    return PriceHistory(capacity=720)
+
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+def record_shared_prices(value, fetched_at):
+    """Prices another replica fetched still go into this replica's history."""
+    df, _ = value
+    if df is not None:
+        price_history().record(dict(zip(df["coin"], df[VS].astype(float))), fetched_at)
+
+def poll_prices(history, ids):
+    """Fetch `ids` in maximal-length batches and append each price to its ring buffer."""
+    df, err = fetch_prices_batched(ids)
+    if df is not None:
+        history.record(dict(zip(df["coin"], df[VS].astype(float))))
+    return df, err
+
+def fetch_prices(ids):
+    """Return a CacheResult whose value is (df, error_message). Never blocks once warm."""
+    return price_cache().get(CACHE_KEY, partial(poll_prices, price_history(), ids))
 
 #Step 4 - REFRESH BUTTON
 # --- Auto Refresh Controls ---
@@ -62,24 +114,127 @@ refresh_sec = st.slider("Refresh every (sec)", 10, 120, 30)
 # Toggle to turn automatic refreshing on/off
 auto_refresh = st.toggle("Enable auto-refresh", value=False)
 
-# Show current refresh time
-st.caption(f"Last refreshed at: {time.strftime('%H:%M:%S')}")
-
 #Step 5 - MAIN VIEW
-st.subheader("Prices")
-df, err = fetch_prices(API_URL)
-
-if err:
-    st.warning(f"{err}\nShowing sample data so the demo continues.")
-    df = SAMPLE_DF.copy()
-
-st.dataframe(df, use_container_width=True)
-
-fig = px.bar(df, x="coin", y=VS, title=f"Current price ({VS.upper()})")
-st.plotly_chart(fig, use_container_width=True)
-
-# If auto-refresh is ON, wait and rerun the app
+def show_prices(result):
+    st.subheader("Prices")
+    if result.value is None:
+        # Only when nothing good was fetched within the max-stale window
+        st.warning(f"{result.error or 'No data yet'}\nShowing sample data so the demo continues.")
+        df = SAMPLE_DF.copy()
+    else:
+        df, _ = result.value
+        # Show when the data on screen was fetched and how old it is
+        fetched = time.strftime('%H:%M:%S', time.localtime(result.fetched_at))
+        note = " — stale, refreshing in the background" if result.stale else ""
+        st.caption(f"Last refreshed at: {fetched} ({result.age:.0f}s ago{note})")
+        if result.error:
+            st.caption(f"⚠️ Latest refresh failed ({result.error}); showing the last good prices.")
+
+    paged_table(df, key="prices_table")
+
+    def build_bar():
+        import plotly.express as px  # only paid for when a new set of coins is charted
+
+        return px.bar(df, x="coin", y=VS, title=f"Current price ({VS.upper()})")
+
+    # The bar chart is built once per set of coins; each poll only patches in new prices
+    with prof.phase("price chart"):
+        base = figure_cache().get(("prices", tuple(df["coin"])), build_bar)
+        fig = patch_figure(base, traces=[{"y": df[VS].to_numpy()}])
+        st.plotly_chart(fig, use_container_width=True)
+
+    with prof.phase("history charts"):
+        show_history()
+
+def show_history():
+    """Percent change and sparklines straight from the ring buffers (no DataFrame per tick)."""
+    history = price_history()
+    changes = history.pct_changes(COINS)
+    if not changes:
+        return
+    st.subheader("📈 Live History")
+    st.caption(f"Each coin keeps its last {history.capacity} polls in a fixed-size buffer.")
+
+    coins = list(changes)
+    show_rolling_stats(history, coins)
+
+    fig = go.Figure(go.Bar(
+        x=coins, y=list(changes.values()),
+        marker_color=["#2ca02c" if v >= 0 else "#d62728" for v in changes.values()],
+    ))
+    fig.update_layout(title="Change over the tracked window (%)", height=320)
+    st.plotly_chart(fig, use_container_width=True)
+
+    shown = coins[:MAX_SPARKLINES]
+    cols = min(4, len(shown))
+    rows = -(-len(shown) // cols)
+    sparks = make_subplots(rows=rows, cols=cols, subplot_titles=shown)
+    for i, coin in enumerate(shown):
+        times, values = history.snapshot(coin)
+        cell = dict(row=i // cols + 1, col=i % cols + 1)
+        sparks.add_trace(
+            go.Scatter(x=pd.to_datetime(times, unit="s"), y=values, mode="lines", name=coin, showlegend=False),
+            **cell,
+        )
+        # Overlays: 24 h rolling mean and z-score anomalies over the same span
+        stats = history.stats(coin)
+        if stats is not None and len(times):
+            trace = stats.trace(since=times[0])
+            sparks.add_trace(
+                go.Scatter(x=pd.to_datetime(trace["time"], unit="s"), y=trace["mean"], mode="lines",
+                           line=dict(dash="dot", width=1, color="gray"), name="24h mean", showlegend=False),
+                **cell,
+            )
+            if len(trace["anomaly_time"]):
+                sparks.add_trace(
+                    go.Scatter(x=pd.to_datetime(trace["anomaly_time"], unit="s"), y=trace["anomaly_value"],
+                               mode="markers", marker=dict(color="#d62728", size=7), name="anomaly", showlegend=False),
+                    **cell,
+                )
+    sparks.update_layout(height=160 * rows, margin=dict(t=40, b=20))
+    st.plotly_chart(sparks, use_container_width=True)
+
+def show_rolling_stats(history, coins):
+    """Metric tiles and a per-coin table from the rolling stats each poll already updated."""
+    summaries = {c: history.stats(c).summary() for c in coins if history.stats(c) is not None}
+    if not summaries:
+        return
+    st.markdown("**Rolling statistics** (24 h and 7 d windows, updated on every poll)")
+    tiles = st.columns(min(4, len(summaries)))
+    for tile, (coin, s) in zip(tiles, summaries.items()):
+        pct = s["delta_24h_pct"]
+        tile.metric(coin, f"${s['last']:,.2f}", delta=None if math.isnan(pct) else f"{pct:+.2f}% vs 24h ago")
+        day = s["24h"]
+        tile.caption(f"24h: mean ${day['mean']:,.2f} · range ${day['min']:,.2f}–${day['max']:,.2f}")
+        if s["anomaly"]:
+            tile.caption(f"🚨 Unusual move: z = {s['z']:+.1f} against the 7-day mean")
+
+    table = pd.DataFrame([
+        {"coin": coin, "last": s["last"], "Δ 24h (%)": s["delta_24h_pct"],
+         "24h mean": s["24h"]["mean"], "24h min": s["24h"]["min"], "24h max": s["24h"]["max"],
+         "24h std": s["24h"]["std"], "7d mean": s["7d"]["mean"], "7d std": s["7d"]["std"],
+         "z (7d)": s["z"], "anomaly": s["anomaly"], "points (7d)": s["7d"]["count"]}
+        for coin, s in summaries.items()
+    ])
+    paged_table(table, key="rolling_stats", hide_index=True)
+
+# If auto-refresh is ON, a shared background poller keeps the cache fresh and
+# only this fragment re-runs on a timer (no sleeping, no full-page rerun)
 if auto_refresh:
-    time.sleep(refresh_sec)
-    fetch_prices.clear()
-    st.rerun()
+    @st.fragment(run_every=refresh_sec)
+    def live_prices():
+        get_poller(f"{price_cache().namespace}:{CACHE_KEY}", partial(price_cache().refresh, CACHE_KEY, partial(poll_prices, price_history(), COINS)), refresh_sec)
+        with prof.phase("fetch prices"):
+            result = fetch_prices(COINS)
+        show_prices(result)
+
+    live_prices()
+else:
+    with prof.phase("fetch prices"):
+        result = fetch_prices(COINS)
+    show_prices(result)
+
+# Shared HTTP client numbers (all sessions in this server process)
+with st.expander("🔌 Upstream request stats"):
+    st.json(get_client().stats())
+prof.finish()
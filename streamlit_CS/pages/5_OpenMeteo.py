@@ -1,10 +1,22 @@
 # Step 1 - Read API once
 import streamlit as st
 import pandas as pd
-import requests
-import plotly.express as px
+import numpy as np
+import math
 import time
-from datetime import datetime, timezone
+from functools import partial
+
+from utils import profiler
+from utils.downsample import METHODS, downsample_indices, points_for_width
+from utils.figure_cache import FigureCache, patch_figure
+from utils.http_client import get_client
+from utils.open_meteo import catch_up_history, load_locations, sync_history
+from utils.paged_table import paged_table
+from utils.refresher import get_poller
+from utils.rolling_stats import StatsRegistry
+from utils.shared_cache import get_backend
+from utils.swr_cache import StaleWhileRevalidateCache
+from utils.weather_store import EPOCH, get_store
 
 st.set_page_config(page_title="Live API Demo (Simple)", page_icon="📡", layout="wide")
 # Disable fade/transition so charts don't blink between reruns
@@ -17,65 +29,73 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("5_OpenMeteo")
+
 st.title("📡 Simple Live Data Demo (Open-Meteo)")
 st.caption("Friendly demo with manual refresh")
 
-lat, lon = 39.7392, -104.9903  # Denver
-# Documentation: https://open-meteo.com/en/docs
-# Combined API URL - fetch both current and hourly data in one call
-today = datetime.now(timezone.utc).date()
-# Combined API URL - fetch both current and hourly data (past 7 days for better visualization)
-combined_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,wind_speed_10m&hourly=temperature_2m,wind_speed_10m&past_days=7&timezone=auto"
-
-@st.cache_data(ttl=600) # cached for 10 minutes
-def get_weather():
-    r = requests.get(combined_url, timeout=10); r.raise_for_status()
-    j = r.json()["current"]
-    return pd.DataFrame([{"time": pd.to_datetime(j["time"]),
-                          "temperature (°C)": j["temperature_2m"],
-                          "wind (km/h)": j["wind_speed_10m"]}])
+# Location index (data/locations.csv) - pick any number of sites in the sidebar
+@profiler.tracked(st.cache_data)
+def location_index():
+    return load_locations()
+
+locations = location_index()
+chosen = st.sidebar.multiselect("Locations", options=list(locations.index), default=["Denver"])
+if not chosen:
+    st.info("Pick at least one location in the sidebar.")
+    st.stop()
+selected = locations.loc[sorted(chosen)]
+focus = st.sidebar.selectbox("Focus location", options=chosen)
+CACHE_KEY = ",".join(selected.index)  # one cache entry / poller per set of locations
 
 st.subheader("Weather Data")
 
 
-@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
-def fetch_all_weather(url: str):
-    """Fetch both current and hourly weather data in one API call. Returns (current_df, hourly_df, error_message)."""
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 429:
-            retry_after = resp.headers.get("Retry-After", "a bit")
-            return None, None, f"429 Too Many Requests — try again after {retry_after}s"
-        resp.raise_for_status()
-        data = resp.json()
-        
-        # Parse current weather
-        current = data["current"]
-        current_df = pd.DataFrame([{
-            "time": pd.to_datetime(current["time"]),
-            "temperature (°C)": current["temperature_2m"],
-            "wind (km/h)": current["wind_speed_10m"]
-        }])
-        
-        # Parse hourly weather
-        hourly = data["hourly"]
-        hourly_df = pd.DataFrame({
-            "time": pd.to_datetime(hourly["time"]),
-            "temperature (°C)": hourly["temperature_2m"],
-            "wind (km/h)": hourly["wind_speed_10m"]
-        })
-        
-        # Filter to show only data up to current time (not future forecast)
-        # timezone fix from error: TypeError: Invalid comparison between dtype=datetime64[ns] and Timestamp
-        if hourly_df['time'].dt.tz is None:
-            # If time is timezone-naive, localize it to UTC
-            hourly_df['time'] = hourly_df['time'].dt.tz_localize('UTC')
-        now = pd.Timestamp.now(tz='UTC')
-        hourly_df = hourly_df[hourly_df['time'] <= now]
-        
-        return current_df, hourly_df, None
-    except requests.RequestException as e:
-        return None, None, f"Network/HTTP error: {e}"
+@st.cache_resource
+def weather_cache():
+    """Last-known-good cache shared by every session: fresh for 10 minutes, still shown for up to 3 hours.
+
+    Current conditions are also shared with other replicas; see sync_shared_weather for the hourly history."""
+    return StaleWhileRevalidateCache(ttl=600, max_stale=3 * 3600, backend=get_backend(),
+                                     namespace="open-meteo-weather", on_shared=sync_shared_weather)
+
+def sync_shared_weather(value, fetched_at):
+    """Conditions another replica fetched: bring this replica's hourly store up to the same hour."""
+    catch_up_history(get_store(), location_index(), value[0])
+
+def sync_weather(selected):
+    """Batch-fetch only the hours missing from the local history store. Returns (current_df, error_message)."""
+    return sync_history(get_store(), selected)
+
+def fetch_all_weather(selected):
+    """Return a CacheResult whose value is (current_df, error_message). Never blocks once warm."""
+    return weather_cache().get(CACHE_KEY, partial(sync_weather, selected))
+
+# `newest` moves every hour, so older entries are dead weight: keep an hour's worth, a few location sets at most
+@profiler.tracked(st.cache_data(ttl=3600, max_entries=16, show_spinner=False))
+def load_history(names: tuple, days: int, newest: int):
+    """Long-format hourly rows from the local store; `newest` (last stored hour) changes whenever new data lands."""
+    return get_store().read_many(list(names), since_utc=newest - days * 86400)
+
+SERIES = {"temperature (°C)": "°C", "wind (km/h)": "km/h"}
+
+@st.cache_resource
+def weather_stats():
+    """Rolling 24 h / 7 d stats per (location, column), shared by every session."""
+    return StatsRegistry()
+
+def update_weather_stats(store, names):
+    """Feed each location's rolling stats only the hours stored since its last update (O(1) per hour)."""
+    registry = weather_stats()
+    for name in names:
+        series = {col: registry.get((name, col)) for col in SERIES}
+        last = min(stats.last_time for stats in series.values())
+        new_rows = store.read(name, since_utc=0 if last == -math.inf else last + 1)
+        if len(new_rows):
+            seconds = (new_rows["time"] - EPOCH).dt.total_seconds().to_numpy()
+            for col, stats in series.items():
+                stats.extend(seconds, new_rows[col].to_numpy())
 
 # Step 4 - REFRESH BUTTON
 # --- Auto Refresh Controls ---
@@ -87,67 +107,61 @@ refresh_sec = st.slider("Refresh every (sec)", 10, 120, 30)
 # Toggle to turn automatic refreshing on/off
 auto_refresh = st.toggle("Enable auto-refresh", value=False)
 
-# Show current refresh time
-st.caption(f"Last refreshed at: {time.strftime('%H:%M:%S')}")
+# History is kept locally, so it can reach further back than one API call
+history_days = st.slider("History to chart (days)", 1, 90, 7)
 
 # Step 5 - MAIN VIEW
-st.subheader("Live Weather Data (with Auto-Refresh)")
-current_df, hourly_df, err = fetch_all_weather(combined_url)
-
-if err:
-    st.warning(f"{err}\nShowing sample data so the demo continues.")
-    current_df = pd.DataFrame([{"time": pd.to_datetime("2025-10-22 16:41:55"), "temperature (°C)": 21.8, "wind (km/h)": 7.4}])
-    hourly_df = None
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
 
-# Display current weather data
-st.dataframe(current_df, use_container_width=True)
-
-# Create metric displays for temperature and wind
-col1, col2 = st.columns(2)
-with col1:
-    st.metric("Temperature", f"{current_df['temperature (°C)'].iloc[0]:.1f} °C")
-with col2:
-    st.metric("Wind Speed", f"{current_df['wind (km/h)'].iloc[0]:.1f} km/h")
-
-# --- TIME SERIES VISUALIZATION ---
-st.subheader("📈 Weather Trends Over Time")
-
-if hourly_df is not None and len(hourly_df) > 0:
-    # Create dual-axis line chart using Plotly
+def build_trend_figure():
+    """Empty dual-axis chart (styling only); the data is patched in per render."""
     from plotly.subplots import make_subplots
     import plotly.graph_objects as go
-    
+
+    # Create dual-axis line chart using Plotly
     fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
+
     # Add temperature trace
     fig.add_trace(
         go.Scatter(
-            x=hourly_df['time'],
-            y=hourly_df['temperature (°C)'],
+            x=[], y=[],
             name="Temperature",
             line=dict(color='#FF6B6B', width=3),
             mode='lines+markers'
         ),
         secondary_y=False,
     )
-    
+
     # Add wind speed trace
     fig.add_trace(
         go.Scatter(
-            x=hourly_df['time'],
-            y=hourly_df['wind (km/h)'],
+            x=[], y=[],
             name="Wind Speed",
             line=dict(color='#4ECDC4', width=3),
             mode='lines+markers'
         ),
         secondary_y=True,
     )
-    
+
+    # Overlays from the rolling stats: 24 h temperature band + mean, z-score anomalies
+    fig.add_trace(go.Scatter(x=[], y=[], name="Temp 24h min", line=dict(width=0), showlegend=False,
+                             hoverinfo="skip"), secondary_y=False)
+    fig.add_trace(go.Scatter(x=[], y=[], name="Temp 24h range", line=dict(width=0), fill="tonexty",
+                             fillcolor="rgba(255,107,107,0.15)", hoverinfo="skip"), secondary_y=False)
+    fig.add_trace(go.Scatter(x=[], y=[], name="Temp 24h mean", line=dict(color='#FF6B6B', width=1.5, dash="dot")),
+                  secondary_y=False)
+    fig.add_trace(go.Scatter(x=[], y=[], name="Temp anomaly", mode="markers",
+                             marker=dict(color="#C0392B", size=10, symbol="x")), secondary_y=False)
+    fig.add_trace(go.Scatter(x=[], y=[], name="Wind anomaly", mode="markers",
+                             marker=dict(color="#16A085", size=10, symbol="x")), secondary_y=True)
+
     # Update layout
     fig.update_xaxes(title_text="Time")
     fig.update_yaxes(title_text="Temperature (°C)", secondary_y=False, color='#FF6B6B')
     fig.update_yaxes(title_text="Wind Speed (km/h)", secondary_y=True, color='#4ECDC4')
-    
+
     fig.update_layout(
         height=400,
         hovermode='x unified',
@@ -159,17 +173,184 @@ if hourly_df is not None and len(hourly_df) > 0:
             x=1
         )
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Show data point count
-    st.caption(f"📊 Showing {len(hourly_df)} hourly data points (past 7 days)")
+    return fig
 
-else:
-    st.info("Waiting for hourly data...")
+def stats_overlays(times, tz, thinned=False):
+    """Patches for the overlay traces: 24 h temperature band/mean and anomalies within `times`.
 
-# If auto-refresh is ON, wait and rerun the app
+    With `thinned`, the band and mean keep only the hours in `times` (the downsampled points)."""
+    if times.empty:
+        return [{"x": [], "y": []}] * 5
+    start, end = ((t - EPOCH).total_seconds() for t in (times.iloc[0], times.iloc[-1]))
+    temp = weather_stats().get((focus, "temperature (°C)")).trace(since=start)
+    wind = weather_stats().get((focus, "wind (km/h)")).trace(since=start)
+
+    def when(seconds):
+        return pd.to_datetime(seconds, unit="s", utc=True).tz_convert(tz)
+
+    shown = temp["time"] <= end
+    if thinned:
+        shown &= np.isin(temp["time"], (times - EPOCH).dt.total_seconds().to_numpy())
+    temp_flags = temp["anomaly_time"] <= end
+    wind_flags = wind["anomaly_time"] <= end
+    return [
+        {"x": when(temp["time"][shown]), "y": temp["min"][shown]},
+        {"x": when(temp["time"][shown]), "y": temp["max"][shown]},
+        {"x": when(temp["time"][shown]), "y": temp["mean"][shown]},
+        {"x": when(temp["anomaly_time"][temp_flags]), "y": temp["anomaly_value"][temp_flags]},
+        {"x": when(wind["anomaly_time"][wind_flags]), "y": wind["anomaly_value"][wind_flags]},
+    ]
+
+def show_weather(result):
+    st.subheader("Live Weather Data (with Auto-Refresh)")
+    if result.value is None:
+        # Only when nothing good was fetched within the max-stale window
+        st.warning(f"{result.error or 'No data yet'}\nShowing sample data so the demo continues.")
+        current_df = pd.DataFrame([{"location": focus, "time": pd.to_datetime("2025-10-22 16:41:55"), "temperature (°C)": 21.8, "wind (km/h)": 7.4}])
+    else:
+        current_df, _ = result.value
+        # Show when the data on screen was fetched and how old it is
+        fetched = time.strftime('%H:%M:%S', time.localtime(result.fetched_at))
+        note = " — stale, refreshing in the background" if result.stale else ""
+        st.caption(f"Last refreshed at: {fetched} ({result.age:.0f}s ago{note})")
+        if result.error:
+            st.caption(f"⚠️ Latest refresh failed ({result.error}); showing the last good weather.")
+
+    # Display current weather data (one row per location)
+    paged_table(current_df, key="weather_table")
+
+    # Create metric displays for temperature and wind at the focus location
+    focus_now = current_df[current_df["location"] == focus]
+    focus_now = focus_now if len(focus_now) else current_df
+    # Rolling stats only take in the hours stored since the last render
+    store = get_store()
+    with prof.phase("rolling stats"):
+        update_weather_stats(store, list(selected.index))
+        summaries = {col: weather_stats().get((focus, col)).summary() for col in SERIES}
+
+    def delta(col):
+        change = summaries[col]["delta_24h"]
+        return None if math.isnan(change) else f"{change:+.1f} {SERIES[col]} vs 24h ago"
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(f"Temperature · {focus}", f"{focus_now['temperature (°C)'].iloc[0]:.1f} °C",
+                  delta=delta("temperature (°C)"))
+    with col2:
+        st.metric(f"Wind Speed · {focus}", f"{focus_now['wind (km/h)'].iloc[0]:.1f} km/h",
+                  delta=delta("wind (km/h)"), delta_color="off")
+
+    # 24 h / 7 d tiles per series, with a flag when the latest hour is far from the 7-day mean
+    for col, unit in SERIES.items():
+        s = summaries[col]
+        day, week = s["24h"], s["7d"]
+        tiles = st.columns(4)
+        tiles[0].metric(f"{col.split(' ')[0].title()} 24h mean", f"{day['mean']:.1f} {unit}")
+        tiles[1].metric("24h min / max", f"{day['min']:.1f} / {day['max']:.1f}")
+        tiles[2].metric("7d mean ± std", f"{week['mean']:.1f} ± {week['std']:.1f}")
+        tiles[3].metric("z-score vs 7d", "n/a" if math.isnan(s["z"]) else f"{s['z']:+.1f}",
+                        delta="🚨 anomaly" if s["anomaly"] else None, delta_color="inverse")
+
+    # --- TIME SERIES VISUALIZATION ---
+    st.subheader("📈 Weather Trends Over Time")
+
+    # Chart straight from the local store (still works while the API is down)
+    with prof.phase("load history"):
+        newest = max(store.last_times(list(selected.index)).values(), default=None)
+        history_df = None if newest is None else load_history(tuple(selected.index), history_days, newest)
+        hourly_df = None
+        if history_df is not None:
+            hourly_df = history_df[history_df["location"] == focus]
+            hourly_df = hourly_df.assign(time=hourly_df["time"].dt.tz_convert(store.timezone(focus)))
+
+    if hourly_df is not None and len(hourly_df) > 0:
+        # Zoom + resolution: whatever window is shown gets re-sampled to fit the chart
+        chart_df = hourly_df
+        with st.expander("🔍 Zoom & resolution"):
+            wall_time = hourly_df['time'].dt.tz_localize(None)
+            if len(hourly_df) > 1:
+                first, last = wall_time.iloc[0].to_pydatetime(), wall_time.iloc[-1].to_pydatetime()
+                start, end = st.slider("Time window", min_value=first, max_value=last, value=(first, last), format="MM/DD HH:mm")
+                chart_df = hourly_df[(wall_time >= start) & (wall_time <= end)]
+            res_col1, res_col2, res_col3 = st.columns(3)
+            with res_col1:
+                method = st.radio("Downsampling", METHODS, horizontal=True)
+            with res_col2:
+                chart_width = st.number_input("Chart width (px)", min_value=300, max_value=4000, value=1200, step=100)
+            with res_col3:
+                full_resolution = st.checkbox("Full resolution", value=False)
+
+        if chart_df.empty:
+            # A window inside a gap in the history, or nothing synced yet
+            st.info("No hourly data in this time window. Widen the window or wait for the next sync.")
+        else:
+            if not full_resolution:
+                # Temperature and wind are reduced together so hover stays aligned
+                with prof.phase("downsample"):
+                    seconds = (chart_df['time'] - chart_df['time'].iloc[0]).dt.total_seconds().to_numpy()
+                    keep = downsample_indices(
+                        seconds,
+                        [chart_df['temperature (°C)'].to_numpy(), chart_df['wind (km/h)'].to_numpy()],
+                        points_for_width(chart_width),
+                        method,
+                    )
+                    chart_df = chart_df.iloc[keep]
+
+            # The dual-axis layout is built once; each render only patches in the data
+            with prof.phase("trend chart"):
+                base = figure_cache().get("weather-trend", build_trend_figure)
+                fig = patch_figure(base, traces=[
+                    {"x": chart_df['time'], "y": chart_df['temperature (°C)']},
+                    {"x": chart_df['time'], "y": chart_df['wind (km/h)']},
+                    *stats_overlays(chart_df['time'], store.timezone(focus), thinned=not full_resolution),
+                ])
+
+                st.plotly_chart(fig, use_container_width=True)
+
+            # Show data point count
+            st.caption(f"📊 Showing {len(chart_df)} of {len(hourly_df)} hourly data points for {focus} (past {history_days} days, from the local history store)")
+
+        # Small multiples: one temperature panel per selected location
+        if len(selected) > 1:
+            st.subheader("🗺️ All Locations")
+            rows = -(-len(selected) // 4)
+
+            def build_grid():
+                import plotly.express as px
+
+                grid = px.line(
+                    history_df, x="time", y="temperature (°C)",
+                    facet_col="location", facet_col_wrap=4, facet_row_spacing=0.08,
+                    height=max(300, 220 * rows),
+                )
+                grid.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+                grid.update_xaxes(title_text="")
+                return grid
+
+            with prof.phase("location grid"):
+                grid = figure_cache().get(("weather-grid", tuple(selected.index), history_days, newest), build_grid)
+                st.plotly_chart(grid, use_container_width=True)
+
+    else:
+        st.info("Waiting for hourly data...")
+
+# If auto-refresh is ON, a shared background poller keeps the cache fresh and
+# only this fragment re-runs on a timer (no sleeping, no full-page rerun)
 if auto_refresh:
-    time.sleep(refresh_sec)
-    fetch_all_weather.clear()
-    st.rerun()
\ No newline at end of file
+    @st.fragment(run_every=refresh_sec)
+    def live_weather():
+        get_poller(f"{weather_cache().namespace}:{CACHE_KEY}", partial(weather_cache().refresh, CACHE_KEY, partial(sync_weather, selected)), refresh_sec)
+        with prof.phase("fetch weather"):
+            result = fetch_all_weather(selected)
+        show_weather(result)
+
+    live_weather()
+else:
+    with prof.phase("fetch weather"):
+        result = fetch_all_weather(selected)
+    show_weather(result)
+
+# Shared HTTP client numbers (all sessions in this server process)
+with st.expander("🔌 Upstream request stats"):
+    st.json(get_client().stats())
+prof.finish()
@@ -1,21 +1,125 @@
 import streamlit as st
+import plotly.graph_objects as go
+import os
+from pathlib import Path
+
+from utils import profiler
+from utils.dashboard import PASS_MARK, compute_dashboard, dashboard_view
+from utils.datasets import read_csv_columnar
+from utils.file_cache import FileCache
 
 st.set_page_config(page_title="Student Performance Dashboard", layout="wide")
 st.title("Student Performance Factors")
 
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("6_Dashboard")
+
+# Synthetic sample shaped like Kaggle's "Student Performance Factors" data;
+# STUDENT_DATA_PATH can point at the real StudentPerformanceFactors.csv
+DATA_PATH = Path(os.environ.get("STUDENT_DATA_PATH", Path(__file__).parent.parent / "data" / "student_performance.csv"))
+
+# One cached, vectorized pass builds every tile; it only re-runs when the CSV changes
+@profiler.tracked(st.cache_resource)
+def dashboard_cache():
+    return FileCache(lambda path: compute_dashboard(read_csv_columnar(path)))
+
+try:
+    with prof.phase("load + aggregate"):
+        dash = dashboard_cache().get(DATA_PATH)
+except FileNotFoundError:
+    st.error(f"Could not find file at: {DATA_PATH}")
+    st.stop()
+
+# ---------- Cross-filters ----------
+# Sidebar ranges, plus selections made on the charts themselves (box/lasso on the
+# scatter, clicks on the heatmaps). Every tile is re-summed from the binned cube,
+# so a new selection never re-scans the raw rows.
+def chart_range(key, axis="x"):
+    """(min, max) of the current selection on chart `key`, or None."""
+    event = st.session_state.get(key) or {}
+    selection = event.get("selection") or {}
+    boxes = selection.get("box") or []
+    if boxes and boxes[0].get(axis):
+        values = boxes[0][axis]
+    else:
+        values = [p[axis] for p in selection.get("points") or [] if isinstance(p.get(axis), (int, float))]
+    return (min(values), max(values)) if values else None
+
+def intersect(a, b):
+    if a is None or b is None:
+        return a or b
+    return (max(a[0], b[0]), min(a[1], b[1]))
+
+def range_slider(label, dim):
+    """Sidebar range over one cube dimension; None while it spans the whole axis."""
+    edges = dash["cube"].edges[dim]
+    # whole-number bins are centered on their value
+    lo, hi = float(edges[0] + 0.5), float(edges[-1] - 0.5)
+    value = st.sidebar.slider(label, min_value=lo, max_value=hi, value=(lo, hi), step=1.0)
+    return None if value == (lo, hi) else value
+
+st.sidebar.header("Cross-filters")
+filters = {
+    "hours": intersect(range_slider("Hours studied", "hours"), chart_range("hours_scatter", "x")),
+    "activity": intersect(range_slider("Physical activity (hrs/week)", "activity"), chart_range("activity_heatmap")),
+    "sleep": intersect(range_slider("Sleep (hrs/night)", "sleep"), chart_range("sleep_heatmap")),
+    "score": intersect(range_slider("Exam score", "score"), chart_range("hours_scatter", "y")),
+}
+active = {k: v for k, v in filters.items() if v is not None}
+if active:
+    st.caption("Filtered by " + ", ".join(f"{k} {v[0]:g}–{v[1]:g}" for k, v in active.items())
+               + " · double-click a chart to clear its selection")
+
+with prof.phase("cross-filter"):
+    view = dashboard_view(dash, filters)
+metrics = view["metrics"]
+trend = view["trend"]
+
+def heatmap_figure(hm, x_title):
+    fig = go.Figure(go.Heatmap(
+        x=hm["x"], y=hm["y"], z=hm["z"],
+        colorscale="Blues",
+        colorbar=dict(title="Students"),
+        hovertemplate=f"{x_title}: %{{x}}<br>Score: %{{y}}<br>Students: %{{z}}<extra></extra>",
+    ))
+    fig.update_layout(height=350, margin=dict(t=20, b=40), xaxis_title=x_title, yaxis_title="Exam Score")
+    return fig
+
 st.divider()
-# ROW 1: 
+# ROW 1:
 col1_r1, col2_r1 = st.columns([2, 1])
 
 with col1_r1:
     st.subheader("Hours Studied Vs Exam Score")
     st.caption("Scatter plot + trendline")
 
-    # graph
+    # graph (box/lasso-select a band of hours to filter the other tiles)
+    with prof.phase("scatter"):
+        mask = view["mask"]
+        fig = go.Figure()
+        if not mask.all():
+            fig.add_trace(go.Scattergl(
+                x=dash["hours"][~mask], y=dash["scores"][~mask], mode="markers", name="Filtered out",
+                marker=dict(size=5, opacity=0.15, color="#B0B0B0"),
+            ))
+        fig.add_trace(go.Scattergl(
+            x=dash["hours"][mask], y=dash["scores"][mask], mode="markers", name="Students",
+            marker=dict(size=5, opacity=0.35, color="#4C78A8"),
+        ))
+        fig.add_trace(go.Scatter(
+            x=trend["x"], y=trend["slope"] * trend["x"] + trend["intercept"], mode="lines",
+            name=f"Trend (r = {trend['r']:.2f})", line=dict(color="#E45756", width=3),
+        ))
+        fig.update_layout(height=380, margin=dict(t=20, b=40), xaxis_title="Hours Studied", yaxis_title="Exam Score",
+                          dragmode="select")
+        st.plotly_chart(fig, use_container_width=True, key="hours_scatter", on_select="rerun", selection_mode=("box", "lasso"))
 
 with col2_r1:
-    st.subheader("Heading")
-    st.write("Big Copy")
+    st.subheader("Average Exam Score")
+    st.metric("Mean score", f"{metrics['mean_score']:.1f}", help=f"Median (all students): {metrics['median_score']:.0f}")
+    st.write(f"Each extra hour of study is worth about **{trend['slope']:.2f} points** on the exam.")
+    if metrics["best_hours"] is not None:
+        st.write(f"Students studying **{metrics['best_hours']} hours** score highest on average.")
 
 st.divider()
 # ROW 2:
@@ -23,35 +127,41 @@ col1_r2, col2_r2, col3_r2 = st.columns(3)
 
 with col1_r2:
     st.subheader("Activity Vs Exam Score Heatmap")
+    st.plotly_chart(heatmap_figure(view["activity_heatmap"], "Physical Activity (hrs/week)"), use_container_width=True,
+                    key="activity_heatmap", on_select="rerun", selection_mode="points")
 
 with col2_r2:
-    st.subheader("Heading")
-    st.write("Big Copy")
+    st.subheader("Lifestyle Links")
+    st.metric("Activity ↔ score (r)", f"{metrics['activity_r']:.2f}")
+    st.metric("Sleep ↔ score (r)", f"{metrics['sleep_r']:.2f}")
+    st.write("Correlation runs from -1 to 1; values near 0 mean little linear relationship.")
 
 with col3_r2:
     st.subheader("Sleep Vs Exam Score Heatmap")
-    st.write("Big Copy")
+    st.plotly_chart(heatmap_figure(view["sleep_heatmap"], "Sleep (hrs/night)"), use_container_width=True,
+                    key="sleep_heatmap", on_select="rerun", selection_mode="points")
 
 st.divider()
 # ROW 3:
 col1_r3, col2_r3 = st.columns([1, 2])
 
 with col1_r3:
-    st.subheader("Heading")
-    st.write("Big Copy")
+    st.subheader("Students")
+    st.metric("In this selection", f"{metrics['students']:,}", help=f"{len(dash['scores']):,} in the dataset")
 
 with col2_r3:
     btn_col1, btn_col2, btn_col3 = st.columns(3)
-    
+
     with btn_col1:
-        st.write("Big Copy")
-    
+        st.metric(f"Pass rate (≥ {PASS_MARK})", f"{metrics['pass_rate']:.0f}%")
+
     with btn_col2:
-        st.write("Big Copy")
-    
+        st.metric("Avg hours studied", f"{metrics['mean_hours']:.1f}")
+
     with btn_col3:
-        st.write("Big Copy")
+        st.metric("Avg sleep (hrs)", f"{metrics['mean_sleep']:.1f}")
 
 # Footer
 st.divider()
-st.caption("Data source")
+st.caption(f"Data source: `{DATA_PATH.name}` (synthetic sample in the shape of Kaggle's Student Performance Factors dataset)")
+prof.finish()
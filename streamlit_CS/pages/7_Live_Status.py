@@ -0,0 +1,152 @@
+# Step 1 - One page, every live feed
+import streamlit as st
+import time
+from functools import partial
+
+from utils import profiler
+from utils.coingecko import VS, fetch_prices_batched
+from utils.live_feeds import fetch_concurrently
+from utils.open_meteo import catch_up_history, load_locations, sync_history
+from utils.shared_cache import get_backend
+from utils.swr_cache import StaleWhileRevalidateCache
+from utils.weather_store import get_store
+
+st.set_page_config(page_title="Live Status", page_icon="🛰️", layout="wide")
+
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("7_Live_Status")
+
+st.title("🛰️ Live Status (prices + weather)")
+st.caption("CoinGecko and Open-Meteo are fetched at the same time; each feed shows up as soon as it arrives.")
+
+# Step 2 - Config
+POPULAR_COINS = ["bitcoin", "ethereum", "solana", "cardano", "dogecoin", "ripple", "litecoin", "polkadot"]
+
+@st.cache_data
+def location_index():
+    return load_locations()
+
+locations = location_index()
+coins = st.sidebar.multiselect("Coins", options=POPULAR_COINS, default=["bitcoin", "ethereum"])
+chosen = st.sidebar.multiselect("Locations", options=list(locations.index), default=["Denver"])
+st.sidebar.markdown("**Timeouts (seconds)**")
+price_timeout = st.sidebar.number_input("Prices", min_value=1.0, max_value=30.0, value=5.0, step=1.0)
+weather_timeout = st.sidebar.number_input("Weather", min_value=1.0, max_value=30.0, value=8.0, step=1.0)
+history_hours = st.sidebar.slider("History to chart (hours)", 6, 168, 48)
+
+if not coins and not chosen:
+    st.info("Pick at least one coin or location in the sidebar.")
+    st.stop()
+selected = locations.loc[sorted(chosen)]
+
+# Step 3 - FETCH (CACHED)
+# Same TTLs, namespaces and keys as the CoinGecko and Open-Meteo pages, so with
+# the shared cache backend this page reuses what they (or other replicas) fetched
+@st.cache_resource
+def feed_caches():
+    backend = get_backend()
+    return {
+        "prices": StaleWhileRevalidateCache(ttl=300, max_stale=3600, backend=backend, namespace="coingecko-prices"),
+        "weather": StaleWhileRevalidateCache(ttl=600, max_stale=3 * 3600, backend=backend, namespace="open-meteo-weather",
+                                             on_shared=sync_shared_weather),
+    }
+
+def sync_shared_weather(value, fetched_at):
+    """Conditions another replica fetched: bring this replica's hourly store up to the same hour."""
+    catch_up_history(get_store(), location_index(), value[0])
+
+caches = feed_caches()
+sources, timeouts = {}, {}
+if coins:
+    sources["prices"] = partial(caches["prices"].get, ",".join(sorted(coins)), partial(fetch_prices_batched, coins))
+    timeouts["prices"] = price_timeout
+if chosen:
+    sources["weather"] = partial(caches["weather"].get, ",".join(selected.index), partial(sync_history, get_store(), selected))
+    timeouts["weather"] = weather_timeout
+
+# Step 4 - REFRESH BUTTON
+st.button("🔄 Refresh")
+
+# Step 5 - MAIN VIEW
+# Every feed gets its slot up front, so they can fill in any order
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("💰 Prices")
+    price_slot = st.empty()
+with col2:
+    st.subheader("🌤️ Current Weather")
+    weather_slot = st.empty()
+st.subheader("📈 Hourly History")
+history_slot = st.empty()
+
+if "prices" in sources:
+    price_slot.info("Fetching prices...")
+else:
+    price_slot.caption("No coins selected.")
+if "weather" in sources:
+    weather_slot.info("Fetching weather...")
+    history_slot.info("Waiting for weather...")
+else:
+    weather_slot.caption("No locations selected.")
+    history_slot.caption("No locations selected.")
+
+def show_freshness(result):
+    """'Fetched 12:00:01 (5s ago)' for a CacheResult, plus any failed refresh."""
+    fetched = time.strftime('%H:%M:%S', time.localtime(result.fetched_at))
+    note = ", stale" if result.stale else ""
+    st.caption(f"Fetched {fetched} ({result.age:.0f}s ago{note})")
+    if result.error:
+        st.caption(f"⚠️ Latest refresh failed ({result.error}); showing the last good data.")
+
+def show_prices(result):
+    with price_slot.container():
+        df, _ = result.value
+        cols = st.columns(min(4, len(df)))
+        for i, row in enumerate(df.head(len(cols)).itertuples(index=False)):
+            cols[i].metric(row.coin, f"${getattr(row, VS):,.2f}")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        show_freshness(result)
+
+def show_weather(result):
+    current_df, _ = result.value
+    with weather_slot.container():
+        st.dataframe(current_df, use_container_width=True, hide_index=True)
+        show_freshness(result)
+
+    # History comes from the local store that the weather sync just filled
+    store = get_store()
+    newest = max(store.last_times(list(selected.index)).values(), default=None)
+    if newest is None:
+        history_slot.info("No hourly history stored yet.")
+        return
+    import plotly.express as px  # only paid for when the chart is drawn
+
+    history_df = store.read_many(list(selected.index), since_utc=newest - history_hours * 3600)
+    fig = px.line(history_df, x="time", y="temperature (°C)", color="location", height=360)
+    history_slot.plotly_chart(fig, use_container_width=True)
+
+def show_failure(slot, feed, message):
+    slot.warning(f"{feed} unavailable: {message}. It will show up on the next refresh once it arrives.")
+
+timings = []
+with prof.phase("fetch feeds"):
+    for feed in fetch_concurrently(sources, timeouts):
+        timings.append(feed)
+        has_value = feed.value is not None and feed.value.value is not None
+        if feed.name == "prices" and has_value:
+            show_prices(feed.value)
+        elif feed.name == "prices":
+            show_failure(price_slot, "Prices", feed.error)
+        elif has_value:
+            show_weather(feed.value)
+        else:
+            show_failure(weather_slot, "Weather", feed.error)
+            history_slot.caption("History needs the weather feed.")
+
+# Concurrency at a glance: the page waits for the slowest feed, not the sum
+if timings:
+    slowest = max(t.elapsed for t in timings)
+    st.caption(" · ".join(f"{t.name}: {t.elapsed:.2f}s{' (timed out)' if t.timed_out else ''}" for t in timings)
+               + f" · page waited {slowest:.2f}s")
+
+prof.finish()
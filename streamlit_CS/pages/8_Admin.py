@@ -0,0 +1,66 @@
+# Step 1 - What this server process is holding
+import streamlit as st
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils import admin_stats, profiler
+from utils.paged_table import paged_table
+
+st.set_page_config(page_title="Admin", page_icon="🛠️", layout="wide")
+
+# Opt-in timings: STREAMLIT_PROFILE=1 or ?profile=1
+prof = profiler.start("8_Admin")
+
+st.title("🛠️ Admin: sessions, caches and threads")
+st.caption("Numbers for this server process only; every replica has its own.")
+
+if not admin_stats.is_enabled():
+    st.info(f"Set `{admin_stats.ENV_FLAG}=1` when starting the server to show this page.")
+    prof.finish()
+    st.stop()
+
+# Step 2 - REFRESH
+st.button("🔄 Refresh")
+auto_refresh = st.toggle("Refresh every 5 s", value=False)
+
+# Step 3 - MAIN VIEW
+def show_stats():
+    ctx = get_script_run_ctx()
+    with prof.phase("measure"):
+        memory = admin_stats.process_memory_mb()
+        sessions = admin_stats.session_rows(ctx.session_id if ctx else None)
+        caches = admin_stats.cache_rows()
+        threads = admin_stats.thread_groups()
+
+    state_kib = sum(r["state KiB"] for r in sessions)
+    cache_kib = sum(r["KiB"] for r in caches)
+    tiles = st.columns(6)
+    tiles[0].metric("Sessions", len(sessions))
+    tiles[1].metric("Process RSS (MB)", "n/a" if memory["rss_mb"] is None else f"{memory['rss_mb']:.0f}")
+    tiles[2].metric("Peak RSS (MB)", f"{memory['peak_rss_mb']:.0f}")
+    tiles[3].metric("Threads", sum(t["count"] for t in threads))
+    tiles[4].metric("Session state (MB)", f"{state_kib / 1024:.2f}")
+    tiles[5].metric("Caches (MB)", f"{cache_kib / 1024:.1f}")
+    st.caption("Sizing: replica memory ≈ process baseline + caches (shared) + sessions × session state and "
+               "rerun working set. `python -m bench.loadgen` measures the per-session part under load.")
+
+    st.subheader("👥 Sessions")
+    if sessions:
+        paged_table(pd.DataFrame(sessions), key="admin_sessions", hide_index=True)
+    else:
+        st.caption("Session details are not available on this Streamlit version.")
+
+    st.subheader("🗄️ Caches")
+    paged_table(pd.DataFrame(caches), key="admin_caches", hide_index=True)
+    st.caption("st.cache_data sizes are Streamlit's own (pickled entries); the rest are estimates.")
+
+    st.subheader("🧵 Threads")
+    st.dataframe(threads, use_container_width=True, hide_index=True)
+
+# Only the numbers re-run on the timer, not the whole page
+if auto_refresh:
+    st.fragment(run_every=5)(show_stats)()
+else:
+    show_stats()
+
+prof.finish()
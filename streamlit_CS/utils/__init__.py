@@ -0,0 +1,5 @@
+"""Shared helpers used by the pages in `/pages`.
+
+Streamlit puts the folder holding `app.py` on `sys.path`, so pages can
+simply write `from utils.refresher import get_poller`.
+"""
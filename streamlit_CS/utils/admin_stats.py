@@ -0,0 +1,189 @@
+"""Memory and thread accounting for this server process (the Admin page).
+
+What one replica holds, split the way it grows:
+
+- per session: the values in each connected session's session state;
+- per cache: every `st.cache_data` / `st.cache_resource` function and the
+  module-level singletons in utils/ (HTTP client, weather store, shared
+  cache backend, feed pool, pollers, paged-table views);
+- threads, grouped by name (script runners, pollers, feed pool, ...);
+- resident memory of the whole process.
+
+Sizes come from `deep_size`, which follows containers and object
+attributes and counts each object once. DataFrames and arrays report their
+buffers, and code (modules, classes, functions) is not counted. Treat the
+numbers as estimates, good for comparing caches and sizing replicas.
+Session and resource-cache listings use Streamlit internals; on versions
+where those are missing the tables come back empty instead of failing.
+
+The page lists session ids, so it only renders with `STREAMLIT_ADMIN=1`.
+"""
+import functools
+import os
+import re
+import resource
+import sys
+import threading
+import types
+from collections import Counter, deque
+
+import numpy as np
+import pandas as pd
+
+ENV_FLAG = "STREAMLIT_ADMIN"
+MAX_OBJECTS = 500_000  # stop walking one object graph after this many objects
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+         types.CodeType, types.FrameType, threading.Thread)
+
+
+def is_enabled() -> bool:
+    return os.environ.get(ENV_FLAG, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def deep_size(obj, seen: set = None) -> int:
+    """Approximate bytes held by `obj` and everything it references. `seen` is shared between calls."""
+    seen = set() if seen is None else seen
+    stack, total, visited = [obj], 0, 0
+    while stack and visited < MAX_OBJECTS:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP):
+            continue
+        seen.add(id(o))
+        visited += 1
+        if isinstance(o, (pd.DataFrame, pd.Series, pd.Index)):
+            usage = o.memory_usage(deep=True)
+            total += int(usage.sum() if isinstance(usage, pd.Series) else usage)
+            continue
+        if isinstance(o, np.ndarray):
+            total += o.nbytes if o.base is None else 0  # views share their base's buffer
+            continue
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif isinstance(o, functools.partial):
+            stack.extend(o.args)
+            stack.append(o.keywords)
+        elif isinstance(o, (str, bytes, int, float, bool)):
+            continue
+        if hasattr(o, "__dict__"):
+            stack.append(vars(o))
+        for slot in getattr(type(o), "__slots__", ()):
+            if isinstance(slot, str) and hasattr(o, slot):
+                stack.append(getattr(o, slot))
+    return total
+
+
+def process_memory_mb() -> dict:
+    """Current and peak resident memory of this process, in MB (current only on Linux)."""
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+    except OSError:
+        pass
+    return {"rss_mb": current, "peak_rss_mb": round(peak, 1)}
+
+
+def thread_groups() -> list[dict]:
+    """Live threads grouped by name with the numbers stripped ("live-feed_3" -> "live-feed")."""
+    groups = Counter()
+    daemons = Counter()
+    for t in threading.enumerate():
+        name = re.sub(r"[_-]?\d+$", "", t.name.split(":")[0]) or t.name
+        groups[name] += 1
+        daemons[name] += t.daemon
+    return [{"threads": name, "count": n, "daemon": daemons[name]} for name, n in groups.most_common()]
+
+
+def _runtime():
+    from streamlit.runtime import Runtime
+
+    return Runtime.instance() if Runtime.exists() else None
+
+
+def session_rows(current_session_id: str = None) -> list[dict]:
+    """One row per session connected to this process: script runs and session state size."""
+    runtime = _runtime()
+    manager = getattr(runtime, "_session_mgr", None)
+    if manager is None:
+        return []
+    rows = []
+    for info in manager.list_sessions():
+        state = info.session.session_state
+        try:
+            values = {key: state[key] for key in list(state)}
+        except Exception:  # a key vanished mid-read (the session is running)
+            values = {}
+        rows.append({
+            "session": info.session.id[:8] + (" (you)" if info.session.id == current_session_id else ""),
+            "connected": info.client is not None,
+            "script runs": info.script_run_count,
+            "state keys": len(values),
+            "state KiB": round(deep_size(values) / 1024, 1),
+        })
+    return rows
+
+
+def _resource_caches():
+    """(function name, [cached values]) for each st.cache_resource function."""
+    from streamlit.runtime.caching import cache_resource_api
+
+    registry = getattr(cache_resource_api, "_resource_caches", None)
+    function_caches = getattr(registry, "_function_caches", {})
+    for caches in list(function_caches.values()):
+        for cache in (caches.values() if isinstance(caches, dict) else [caches]):
+            entries = list(getattr(cache, "_mem_cache", {}).values())
+            yield cache.display_name, [getattr(e, "value", e) for e in entries]
+
+
+def _data_cache_bytes() -> dict:
+    """Bytes per st.cache_data function, from Streamlit's own stats (pickled entry sizes)."""
+    runtime = _runtime()
+    if runtime is None:
+        return {}
+    stats = runtime.stats_mgr.get_stats()
+    flat = [s for group in stats.values() for s in group] if isinstance(stats, dict) else stats
+    sizes = Counter()
+    for stat in flat:
+        if getattr(stat, "category_name", "") == "st_cache_data":
+            sizes[stat.cache_name] += stat.byte_length
+    return sizes
+
+
+def _singletons() -> dict:
+    """Module-level shared objects in utils/ that live outside Streamlit's caches."""
+    from utils import http_client, live_feeds, paged_table, refresher, shared_cache, weather_store
+
+    return {
+        "http_client (pooled client)": http_client._client,
+        "weather_store (SQLite store)": weather_store._store,
+        "shared_cache (backend)": shared_cache._backend,
+        "live_feeds (thread pool)": live_feeds._executor,
+        "refresher (pollers)": dict(refresher._pollers),
+        "paged_table (views)": dict(paged_table._views),
+    }
+
+
+def cache_rows() -> list[dict]:
+    """One row per cache, largest first. Objects shared by two caches are counted in the first only."""
+    seen = set()
+    rows = []
+    for name, values in _resource_caches():
+        rows.append({"cache": name, "kind": "st.cache_resource", "entries": len(values),
+                     "KiB": deep_size(values, seen) / 1024})
+    for name, size in _data_cache_bytes().items():
+        rows.append({"cache": name, "kind": "st.cache_data", "entries": None, "KiB": size / 1024})
+    for name, value in _singletons().items():
+        if value is not None:
+            rows.append({"cache": name, "kind": "module", "entries": None, "KiB": deep_size(value, seen) / 1024})
+    for row in rows:
+        row["KiB"] = round(row["KiB"], 1)
+    return sorted(rows, key=lambda r: r["KiB"], reverse=True)
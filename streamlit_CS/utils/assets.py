@@ -0,0 +1,148 @@
+"""Pre-sized, content-hashed image variants for the files in assets/.
+
+`build_all()` turns every image in assets/ into a few widths, each as WebP
+and JPEG, and writes them to static/img/. Streamlit serves that folder at
+app/static/img/ when `server.enableStaticServing` is on (see
+.streamlit/config.toml). File names carry a hash of the source bytes, e.g.
+headshot-320w-1a2b3c4d.webp. A URL therefore never changes meaning, and
+browsers and CDNs can keep the file for as long as they like. Sources that
+have not changed since the last build are skipped, using the hashes in
+static/img/manifest.json.
+
+`picture_html()` writes a <picture> tag with srcset/sizes, so the browser
+downloads the smallest variant that fits the column (WebP when it can).
+Build ahead of deploy with `python -m utils.assets [names...]`; pages also
+call `build_all([...])` once per process for the images they show, so a
+fresh checkout works too and unused files in assets/ cost nothing.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+ROOT = Path(__file__).parent.parent
+SOURCE_DIR = ROOT / "assets"
+OUTPUT_DIR = ROOT / "static" / "img"
+URL_PREFIX = "app/static/img"
+MANIFEST = OUTPUT_DIR / "manifest.json"
+
+WIDTHS = (160, 320, 480, 640, 960)
+FORMATS = {"webp": {"quality": 80, "method": 6}, "jpeg": {"quality": 82, "optimize": True, "progressive": True}}
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+# Bump when WIDTHS/FORMATS change so old builds are redone
+PIPELINE_VERSION = "1"
+
+
+def _digest(path: Path) -> str:
+    h = hashlib.sha256(PIPELINE_VERSION.encode())
+    h.update(path.read_bytes())
+    return h.hexdigest()[:8]
+
+
+def _save(image: Image.Image, path: Path, fmt: str):
+    """Encode to a temp file and rename, so a half-written variant is never served."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, format=fmt.upper(), **FORMATS[fmt])
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_variants(source: Path, digest: str) -> dict:
+    """Write every width x format of `source`; returns its manifest entry."""
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    widths = sorted({w for w in WIDTHS if w < image.width} | {image.width})
+    variants = []
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            frame = resized
+            if fmt == "jpeg" and frame.mode != "RGB":
+                # JPEG has no alpha: flatten transparent images onto white
+                background = Image.new("RGB", frame.size, "white")
+                background.paste(frame, mask=frame.convert("RGBA").getchannel("A"))
+                frame = background
+            name = f"{source.stem}-{width}w-{digest}.{fmt}"
+            _save(frame, OUTPUT_DIR / name, fmt)
+            variants.append({"file": name, "width": width, "height": height, "format": fmt,
+                             "bytes": (OUTPUT_DIR / name).stat().st_size})
+    return {"digest": digest, "width": image.width, "height": image.height, "variants": variants}
+
+
+def load_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def build_all(names=None) -> dict:
+    """Build variants for any new or changed image in assets/ and drop stale ones; returns the manifest.
+
+    With `names`, only those files are built; variants already built for the others are kept.
+    """
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest()
+    sources = sorted(p for p in SOURCE_DIR.iterdir() if p.suffix.lower() in SOURCE_SUFFIXES)
+    fresh = {}
+    for source in sources:
+        entry = manifest.get(source.name)
+        if names is not None and source.name not in names:
+            if entry:
+                fresh[source.name] = entry
+            continue
+        digest = _digest(source)
+        if not entry or entry["digest"] != digest or not all((OUTPUT_DIR / v["file"]).exists() for v in entry["variants"]):
+            entry = build_variants(source, digest)
+        fresh[source.name] = entry
+    # Remove variants of old versions and of deleted sources
+    keep = {v["file"] for entry in fresh.values() for v in entry["variants"]} | {MANIFEST.name}
+    for path in OUTPUT_DIR.iterdir():
+        if path.name not in keep and path.suffix != ".tmp":  # .tmp: another process mid-write
+            path.unlink(missing_ok=True)
+    if fresh != manifest:
+        MANIFEST.write_text(json.dumps(fresh, indent=1), encoding="utf-8")
+    return fresh
+
+
+def variant_path(entry: dict, width: int, fmt: str = "webp") -> Path:
+    """Smallest variant at least `width` px wide (or the largest there is)."""
+    options = sorted((v for v in entry["variants"] if v["format"] == fmt), key=lambda v: v["width"])
+    best = next((v for v in options if v["width"] >= width), options[-1])
+    return OUTPUT_DIR / best["file"]
+
+
+def picture_html(entry: dict, alt: str, sizes: str = "100vw") -> str:
+    """<picture> with WebP and JPEG srcsets; the browser picks the width that fits `sizes`."""
+    def srcset(fmt):
+        return ", ".join(f"{URL_PREFIX}/{v['file']} {v['width']}w" for v in entry["variants"] if v["format"] == fmt)
+
+    fallback = variant_path(entry, 480, "jpeg").name
+    return (
+        "<picture>"
+        f'<source type="image/webp" srcset="{srcset("webp")}" sizes="{sizes}">'
+        f'<img src="{URL_PREFIX}/{fallback}" srcset="{srcset("jpeg")}" sizes="{sizes}" '
+        f'width="{entry["width"]}" height="{entry["height"]}" alt="{alt}" loading="lazy" decoding="async" '
+        'style="width:100%;height:auto;border-radius:0.5rem">'
+        "</picture>"
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    for name, entry in build_all(sys.argv[1:] or None).items():
+        total = sum(v["bytes"] for v in entry["variants"])
+        print(f"{name}: {len(entry['variants'])} variants, {total / 1024:.0f} KiB total, "
+              f"source {(SOURCE_DIR / name).stat().st_size / 1024:.0f} KiB")
+        for v in entry["variants"]:
+            print(f"  {v['file']:<40} {v['bytes'] / 1024:>6.1f} KiB")
@@ -0,0 +1,70 @@
+"""CoinGecko fetch + parse logic shared by the crypto pages."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from utils.http_client import RateLimited, get_client
+
+VS = "usd"
+HEADERS = {"User-Agent": "msudenver-dataviz-class/1.0", "Accept": "application/json"}
+API_BASE = os.environ.get("COINGECKO_API_BASE", "https://api.coingecko.com/api/v3")  # overridable for local stubs
+COINS_LIST_URL = f"{API_BASE}/coins/list"
+MAX_URL_LENGTH = 2000   # stay well under common proxy/server URL limits
+MAX_WORKERS = 2         # be gentle with the public rate limit
+
+
+def build_url(ids):
+    return f"{API_BASE}/simple/price?ids={','.join(ids)}&vs_currencies={VS}"
+
+
+def build_urls(ids, max_length: int = MAX_URL_LENGTH):
+    """Pack `ids` into as few `build_url` URLs as possible, each at most `max_length` chars."""
+    urls, batch = [], []
+    for coin in ids:
+        if batch and len(build_url(batch + [coin])) > max_length:
+            urls.append(build_url(batch))
+            batch = []
+        batch.append(coin)
+    if batch:
+        urls.append(build_url(batch))
+    return urls
+
+
+def fetch_prices(url: str):
+    """Return (df, error_message). Never raise. Safe for beginners."""
+    try:
+        # Shared pooled client: retries with backoff and coalesces concurrent misses
+        data = get_client().get_json(url, headers=HEADERS, timeout=10)
+        df = pd.DataFrame(data).T.reset_index().rename(columns={"index": "coin"})
+        return df, None
+    except RateLimited as e:
+        return None, str(e)
+    except requests.RequestException as e:
+        return None, f"Network/HTTP error: {e}"
+
+
+def fetch_prices_batched(ids):
+    """Fetch prices for any number of coins using maximal-length batches. Returns (df, error_message)."""
+    urls = build_urls(ids)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls)) or 1) as pool:
+        results = list(pool.map(fetch_prices, urls))
+    frames = [df for df, _ in results if df is not None and not df.empty]
+    errors = [err for _, err in results if err]
+    if not frames:
+        return None, errors[0] if errors else "No prices returned"
+    # Partial success still returns data; the error names what went missing
+    err = f"{len(errors)} of {len(urls)} batches failed: {errors[0]}" if errors else None
+    return pd.concat(frames, ignore_index=True), err
+
+
+def fetch_coin_list():
+    """Return (df of id/symbol/name for every listed coin, error_message)."""
+    try:
+        data = get_client().get_json(COINS_LIST_URL, headers=HEADERS, timeout=10)
+        return pd.DataFrame(data, columns=["id", "symbol", "name"]), None
+    except RateLimited as e:
+        return None, str(e)
+    except requests.RequestException as e:
+        return None, f"Network/HTTP error: {e}"
@@ -0,0 +1,59 @@
+"""Streaming category totals for CSVs too large to load in one go."""
+import pandas as pd
+
+OTHER = "Other"
+# Files bigger than this are streamed in chunks instead of loaded whole
+LARGE_FILE_BYTES = 50 * 1024 * 1024
+
+
+def aggregate_csv(path, category_col: str = "Category", value_col: str = "Value",
+                  chunksize: int = 500_000):
+    """Read `path` in chunks and total `value_col` per `category_col` in a single pass.
+
+    Only the two needed columns are parsed, with fixed dtypes, so memory stays
+    flat regardless of file size (it grows with the number of categories, not
+    rows). Returns (totals, stats):
+    - totals: Series of per-category sums, largest first
+    - stats: total, mean (per row), rows, categories, top_category, top_value
+    """
+    totals = None
+    rows = 0
+    reader = pd.read_csv(
+        path,
+        usecols=[category_col, value_col],
+        dtype={category_col: "category", value_col: "float64"},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        part = chunk.groupby(category_col, observed=True, sort=False)[value_col].sum()
+        part.index = part.index.astype(object)  # chunk categories differ; align on plain labels
+        totals = part if totals is None else totals.add(part, fill_value=0)
+        rows += len(chunk)
+
+    if totals is None or totals.empty:
+        return pd.Series(dtype="float64", name=value_col).rename_axis(category_col), None
+
+    totals = totals.sort_values(ascending=False)
+    total = float(totals.sum())
+    stats = {
+        "total": total,
+        "mean": total / rows,
+        "rows": rows,
+        "categories": len(totals),
+        "top_category": totals.index[0],
+        "top_value": float(totals.iloc[0]),
+    }
+    return totals.rename(value_col).rename_axis(category_col), stats
+
+
+def top_n_with_other(totals, top_n: int = 10):
+    """Keep the `top_n` largest categories of `totals` and fold the rest into one "Other" row.
+
+    A real category named "Other" in the top rows absorbs the remainder, so there is never a second one.
+    """
+    top = totals.head(top_n)
+    rest = totals.iloc[top_n:]
+    if len(rest):
+        folded = rest.sum() + top.get(OTHER, 0)
+        top = pd.concat([top.drop(OTHER, errors="ignore"), pd.Series({OTHER: folded})])
+    return top.rename_axis(totals.index.name).reset_index(name=totals.name)
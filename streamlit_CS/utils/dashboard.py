@@ -0,0 +1,126 @@
+"""Every tile of the student-performance dashboard, from one binned pass.
+
+The raw columns are pulled out as NumPy arrays once and dropped into a
+hours x activity x sleep x score cube (see `utils.crossfilter`), one bin per
+whole number on every axis, so range filters are exact. The trendline, both
+heatmaps and the headline numbers are all sums over that cube, so a
+cross-filter selection is array slicing, not a new group-by. The heatmaps
+fold the score axis into 5-point bands only when they are drawn.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.crossfilter import CrossFilterCube
+
+HOURS, ACTIVITY, SLEEP, SCORE = "Hours_Studied", "Physical_Activity", "Sleep_Hours", "Exam_Score"
+PASS_MARK = 65          # exam score counted as a pass
+SCORE_BIN_WIDTH = 5     # heatmap rows are 5-point score bands
+
+
+def fit_from_sums(n, sx, sy, sxx, syy, sxy):
+    """Closed-form least squares from moment sums: (slope, intercept, r) for y ≈ slope * x + intercept."""
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    if n < 2 or var_x <= 0:
+        return 0.0, (sy / n if n else 0.0), 0.0
+    slope = (n * sxy - sx * sy) / var_x
+    intercept = (sy - slope * sx) / n
+    r = (n * sxy - sx * sy) / np.sqrt(var_x * var_y) if var_y > 0 else 0.0
+    return float(slope), float(intercept), float(r)
+
+
+def linear_fit(x, y):
+    """Closed-form least squares straight from two arrays."""
+    return fit_from_sums(len(x), x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum())
+
+
+def _integer_edges(values):
+    """Bin edges with one bin per whole number in `values` (e.g. sleep hours 4..10)."""
+    lo, hi = np.floor(values.min()), np.ceil(values.max())
+    return np.arange(lo, hi + 2) - 0.5
+
+
+def score_bands(cube):
+    """(band of every score bin, band labels) for folding the 1-point score axis into 5-point bands."""
+    start = np.floor(cube.centers("score") / SCORE_BIN_WIDTH) * SCORE_BIN_WIDTH
+    lows, band = np.unique(start, return_inverse=True)
+    return band, [f"{int(lo)}–{int(lo) + SCORE_BIN_WIDTH - 1}" for lo in lows]
+
+
+def compute_dashboard(df: pd.DataFrame) -> dict:
+    """The single pass over the raw rows: arrays for the scatter plus the binned cube."""
+    hours = df[HOURS].to_numpy(dtype=float)
+    activity = df[ACTIVITY].to_numpy(dtype=float)
+    sleep = df[SLEEP].to_numpy(dtype=float)
+    scores = df[SCORE].to_numpy(dtype=float)
+
+    cube = CrossFilterCube(
+        {"hours": hours, "activity": activity, "sleep": sleep, "score": scores},
+        {"hours": _integer_edges(hours), "activity": _integer_edges(activity),
+         "sleep": _integer_edges(sleep), "score": _integer_edges(scores)},
+        x="hours", y="score",
+    )
+    return {"hours": hours, "scores": scores, "cube": cube, "median_score": float(np.median(scores))}
+
+
+def _heatmap(cube, dim, filters):
+    counts = cube.counts(filters, keep=(dim, "score"))
+    band, labels = score_bands(cube)
+    banded = counts @ (band[:, None] == np.arange(len(labels)))  # sum score bins into their bands
+    return {
+        "x": cube.centers(dim),
+        "y": labels,
+        "z": banded.T,  # rows = score bands, columns = `dim` bins
+    }
+
+
+def _binned_fit(cube, dim, filters):
+    """Correlation of a binned dim with score, using bin centers (exact for whole-number data)."""
+    counts = cube.counts(filters, keep=(dim,))
+    score_sums = cube.counts(filters, keep=(dim,), cube=cube.sums["y"])
+    score_sq = cube.counts(filters, keep=(dim,), cube=cube.sums["yy"])
+    c = cube.centers(dim)
+    n = counts.sum()
+    return fit_from_sums(n, (c * counts).sum(), score_sums.sum(), (c * c * counts).sum(),
+                         score_sq.sum(), (c * score_sums).sum())
+
+
+def dashboard_view(dash: dict, filters: dict) -> dict:
+    """Every tile for the current cross-filter selection, e.g. {"hours": (10, 20), "sleep": None}."""
+    cube = dash["cube"]
+    t = cube.totals(filters)
+    n = t["n"]
+    slope, intercept, r = fit_from_sums(n, t["x"], t["y"], t["xx"], t["yy"], t["xy"])
+
+    # Headline numbers use every filter, including the one on their own axis
+    passing = cube.selected_counts(filters, "score")[cube.centers("score") >= PASS_MARK].sum()
+
+    per_hour_n = cube.counts(filters, keep=("hours",))
+    per_hour_sum = cube.counts(filters, keep=("hours",), cube=cube.sums["y"])
+    per_hour_mean = np.where(per_hour_n >= 10, per_hour_sum / np.maximum(per_hour_n, 1), -np.inf)
+
+    def mean_of(dim):
+        counts = cube.selected_counts(filters, dim)
+        return float((cube.centers(dim) * counts).sum() / n) if n else float("nan")
+
+    hours_x = cube.centers("hours")[per_hour_n > 0]
+    return {
+        "trend": {"slope": slope, "intercept": intercept, "r": r,
+                  "x": np.array([hours_x.min(), hours_x.max()]) if len(hours_x) else np.array([0.0, 0.0])},
+        "activity_heatmap": _heatmap(cube, "activity", filters),
+        "sleep_heatmap": _heatmap(cube, "sleep", filters),
+        "mask": cube.row_mask(filters),
+        "metrics": {
+            "students": int(n),
+            "mean_score": t["y"] / n if n else float("nan"),
+            "median_score": dash["median_score"],  # whole dataset
+            "pass_rate": float(passing / n * 100) if n else float("nan"),
+            "mean_hours": t["x"] / n if n else float("nan"),
+            "mean_sleep": mean_of("sleep"),
+            "mean_activity": mean_of("activity"),
+            # study hours with the highest average score (bins with 10+ students)
+            "best_hours": int(cube.centers("hours")[np.argmax(per_hour_mean)]) if np.isfinite(per_hour_mean).any() else None,
+            "sleep_r": _binned_fit(cube, "sleep", filters)[2],
+            "activity_r": _binned_fit(cube, "activity", filters)[2],
+        },
+    }
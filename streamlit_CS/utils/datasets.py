@@ -0,0 +1,73 @@
+"""Columnar on-disk cache for the datasets the pages load.
+
+Each source (a bundled Plotly dataset, a CSV file, ...) is converted to an
+uncompressed Arrow IPC file once. Every later load, in any server process,
+memory-maps that file instead of decompressing and parsing CSV text again;
+numeric columns come back zero-copy, backed by the shared OS page cache.
+Pages should hand these frames out through `st.cache_resource` (shared,
+read-only) rather than `st.cache_data`, which pickles a copy per session.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+
+CACHE_DIR = Path(os.environ.get("ARROW_CACHE_DIR", Path(__file__).parent.parent / "data" / ".arrow_cache"))
+
+
+def _write_arrow(df: pd.DataFrame, path: Path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file and rename, so other processes never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # split_blocks keeps each column in its own block so numeric columns stay zero-copy views
+    return table.to_pandas(split_blocks=True)
+
+
+def load_dataset(name: str, source: Callable[[], pd.DataFrame], version: str = "1") -> pd.DataFrame:
+    """Return `source()` via the Arrow cache; bump `version` whenever the source changes."""
+    tag = hashlib.sha1(version.encode()).hexdigest()[:12]
+    path = CACHE_DIR / f"{name}-{tag}.arrow"
+    if not path.exists():
+        _write_arrow(source(), path)
+        # Drop files left by older versions of the same dataset
+        for old in CACHE_DIR.glob(f"{name}-{'?' * len(tag)}.arrow"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    return _read_arrow(path)
+
+
+def load_bundled(name: str) -> pd.DataFrame:
+    """Plotly's bundled `tips` / `gapminder` data, or the CSV in TIPS_DATA_PATH / GAPMINDER_DATA_PATH."""
+    override = os.environ.get(f"{name.upper()}_DATA_PATH")
+    if override:
+        return read_csv_columnar(override)
+    import plotly
+    from plotly import data  # lighter than plotly.express, which re-exports it
+
+    return load_dataset(name, getattr(data, name), version=plotly.__version__)
+
+
+def read_csv_columnar(path, **read_csv_kwargs) -> pd.DataFrame:
+    """`pd.read_csv(path)`, parsed once per file version (path + mtime + size) and then memory-mapped."""
+    path = Path(path).resolve()
+    st = os.stat(path)
+    name = f"{path.stem}-{hashlib.sha1(str(path).encode()).hexdigest()[:8]}"
+    version = f"{st.st_mtime_ns}:{st.st_size}:{sorted(read_csv_kwargs.items())}"
+    return load_dataset(name, lambda: pd.read_csv(path, **read_csv_kwargs), version)
@@ -0,0 +1,73 @@
+"""Server-side downsampling for long time series.
+
+A chart can't show more points than it has pixels, so long series are
+reduced before plotting:
+- LTTB (Largest-Triangle-Three-Buckets) keeps the visual shape of a line
+- min/max bucketing keeps every spike, fully vectorized
+Several series sharing an x axis are reduced together (the union of the
+indices each one picks), so unified hover still lines them up.
+"""
+import numpy as np
+
+METHODS = ("LTTB", "Min/Max")
+
+
+def points_for_width(width_px: int, points_per_px: float = 1.0) -> int:
+    """Point budget for a chart `width_px` wide."""
+    return max(3, int(width_px * points_per_px))
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points LTTB keeps (first and last are always kept)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0  # previously selected point
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # Twice the triangle area (a, candidate, next-bucket average), for every candidate at once
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out: int) -> np.ndarray:
+    """Indices of each bucket's min and max (n_out // 2 buckets), plus first and last."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    buckets = n_out // 2
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    row_start = np.arange(buckets) * size
+    lows = row_start + np.argmin(np.where(np.isnan(grid), np.inf, grid), axis=1)
+    highs = row_start + np.argmax(np.where(np.isnan(grid), -np.inf, grid), axis=1)
+    idx = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(idx[idx < n])
+
+
+def downsample_indices(x, ys, n_out: int, method: str = "LTTB") -> np.ndarray:
+    """Sorted row indices to keep so that every series in `ys` fits roughly `n_out` points."""
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    per_series = max(4, n_out // max(1, len(ys)))
+    picks = [
+        lttb_indices(x, y, per_series) if method == "LTTB" else minmax_indices(y, per_series)
+        for y in ys
+    ]
+    return np.unique(np.concatenate(picks))
@@ -0,0 +1,91 @@
+"""Figure cache with cheap patch-based updates.
+
+Building a Plotly Express figure (grouping by color/size, generating traces,
+applying the template) is the expensive part of drawing a chart. The cache
+keeps one figure dict per (data fingerprint, data-shaping params); styling
+widgets such as colors, hole size or labels, and small data deltas such as
+new y values, are then applied as a patch on a shallow copy of that dict
+instead of rebuilding the figure.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from utils.profiler import record_cache
+
+
+def data_fingerprint(data) -> str:
+    """Content hash for a DataFrame/Series/array (use for small derived frames;
+    for big cached datasets pass the dataset name + filter params as the key instead)."""
+    h = hashlib.sha1()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        h.update(repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name).encode())
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        h.update(str(data.dtype).encode())
+        h.update(np.ascontiguousarray(data).tobytes())
+    else:
+        h.update(repr(data).encode())
+    return h.hexdigest()
+
+
+def _merge(base, patch):
+    """Return `base` with `patch` deep-merged in; only dicts along the patch path are copied."""
+    out = dict(base)
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def patch_figure(figure: dict, layout: dict = None, traces=None, all_traces: dict = None) -> dict:
+    """Apply a styling/data patch to a cached figure dict without touching the cached copy.
+
+    - layout: merged into `figure["layout"]`
+    - traces: list of per-trace patches, matched to `figure["data"]` by position
+    - all_traces: one patch merged into every trace
+    """
+    data = figure["data"]
+    if traces is not None or all_traces is not None:
+        data = [
+            _merge(_merge(trace, all_traces or {}), traces[i] if traces and i < len(traces) else {})
+            for i, trace in enumerate(data)
+        ]
+    return {**figure, "data": data, "layout": _merge(figure["layout"], layout or {})}
+
+
+class FigureCache:
+    """Small LRU of built figures (stored as plain dicts), shared across sessions."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._figures: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build: Callable) -> dict:
+        """Return the cached figure dict for `key`, calling `build()` (a go.Figure) on a miss."""
+        label = f"figure:{key[0] if isinstance(key, tuple) else key}"
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                record_cache(label, hit=True)
+                return self._figures[key]
+        t0 = time.perf_counter()
+        figure = build().to_dict()
+        record_cache(label, hit=False, ms=(time.perf_counter() - t0) * 1000)
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
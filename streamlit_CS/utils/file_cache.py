@@ -0,0 +1,135 @@
+"""Cache for data loaded from files, invalidated when the file changes.
+
+Entries are keyed on the file's path, mtime and size (plus an optional
+content hash, so a `touch` without a real edit doesn't force a reload). A
+background watcher notices edits and re-runs the loader right away, so the
+next page render finds the new data already parsed.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+from utils.profiler import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class FileSignature(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    digest: Optional[str] = None
+
+
+def content_digest(path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_signature(path, content_hash: bool = False) -> FileSignature:
+    """Cheap identity of a file's current version (raises FileNotFoundError if missing)."""
+    st = os.stat(path)
+    digest = content_digest(path) if content_hash else None
+    return FileSignature(str(Path(path).resolve()), st.st_mtime_ns, st.st_size, digest)
+
+
+class _Entry(NamedTuple):
+    signature: FileSignature
+    value: Any
+
+
+class FileCache:
+    """`get(path)` returns `loader(path)`, re-running the loader only when the file changed."""
+
+    def __init__(self, loader: Callable[[str], Any], content_hash: bool = False, poll_interval: float = 2.0):
+        self._loader = loader
+        self._content_hash = content_hash
+        self._poll_interval = poll_interval
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Event] = {}  # files whose loader is running
+        self._watched: set[str] = set()
+        self._watcher = None
+        self.loads = 0  # how many times the loader actually ran
+
+    def _current_signature(self, key, entry):
+        st = os.stat(key)
+        if entry and (st.st_mtime_ns, st.st_size) == entry.signature[1:3]:
+            return entry.signature
+        digest = None
+        if self._content_hash:
+            digest = content_digest(key)
+            # Touched but identical: keep the entry, just note the new mtime
+            if entry and digest == entry.signature.digest:
+                signature = entry.signature._replace(mtime_ns=st.st_mtime_ns)
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        self._entries[key] = entry._replace(signature=signature)
+                return signature
+        return FileSignature(key, st.st_mtime_ns, st.st_size, digest)
+
+    def get(self, path):
+        """The loaded value for the file's current version.
+
+        The loader runs outside the lock, at most once at a time per file.
+        While a reload is running, other callers get the previous value.
+        """
+        key = str(Path(path).resolve())
+        name = f"file:{Path(key).name}"
+        signature = self._current_signature(key, self._entries.get(key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                record_cache(name, hit=True)
+                return entry.value
+            pending = self._loading.get(key)
+            loading_here = pending is None
+            if loading_here:
+                pending = self._loading[key] = threading.Event()
+        if not loading_here:
+            if entry is not None:
+                record_cache(name, hit=True)  # stale until the running reload lands
+                return entry.value
+            pending.wait()  # first load of this file: nothing older to serve
+            return self.get(key)
+        try:
+            t0 = time.perf_counter()
+            value = self._loader(key)
+            with self._lock:
+                self._entries[key] = _Entry(signature, value)
+                self.loads += 1
+            record_cache(name, hit=False, ms=(time.perf_counter() - t0) * 1000)
+            return value
+        finally:
+            with self._lock:
+                del self._loading[key]
+            pending.set()
+
+    def signature(self, path) -> Optional[FileSignature]:
+        """Signature of the cached version of `path` (None if not loaded yet)."""
+        entry = self._entries.get(str(Path(path).resolve()))
+        return entry.signature if entry else None
+
+    def watch(self, path):
+        """Reload `path` in the background as soon as it changes on disk."""
+        with self._lock:
+            self._watched.add(str(Path(path).resolve()))
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch_loop, name="file-cache-watcher", daemon=True)
+                self._watcher.start()
+
+    def _watch_loop(self):
+        stop = threading.Event()
+        while not stop.wait(self._poll_interval):
+            for key in list(self._watched):
+                try:
+                    self.get(key)  # no-op unless the file changed; otherwise pre-warms
+                except Exception as e:  # missing/half-written file: try again next tick
+                    logger.warning("could not reload %s: %s", key, e)
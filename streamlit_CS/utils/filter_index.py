@@ -0,0 +1,44 @@
+"""Precomputed row-position indexes for fast equality filters.
+
+Built once per dataset: for every indexed column, the sorted row positions
+of each distinct value. A filter then costs a dictionary lookup plus a
+merge of position arrays (proportional to the rows it returns) instead of a
+full-frame boolean scan or a `df.query` string parse on every rerun.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    def __init__(self, df: pd.DataFrame, columns):
+        self.df = df
+        self._positions: dict[str, dict] = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], sort=True)
+            order = np.argsort(codes, kind="stable")  # positions grouped by value, ascending within a group
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self._positions[col] = {
+                value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques.tolist())
+            }
+
+    def values(self, col):
+        """Distinct values of `col`, sorted."""
+        return list(self._positions[col])
+
+    def positions(self, col, values) -> np.ndarray:
+        """Sorted row positions where `col` equals `values` (a single value or a list of them)."""
+        index = self._positions[col]
+        if not isinstance(values, (list, tuple, set)):
+            return index.get(values, np.empty(0, dtype=np.intp))
+        parts = [index[v] for v in values if v in index]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def select(self, **criteria) -> pd.DataFrame:
+        """Rows matching every `column=value(s)` criterion; a criterion of None is ignored."""
+        selected = None
+        # Intersect smallest first so the work tracks the size of the result
+        for pos in sorted((self.positions(c, v) for c, v in criteria.items() if v is not None), key=len):
+            selected = pos if selected is None else np.intersect1d(selected, pos, assume_unique=True)
+        return self.df if selected is None else self.df.iloc[selected]
@@ -0,0 +1,168 @@
+"""Process-wide HTTP client shared by every page that talks to an API.
+
+- one pooled keep-alive `requests.Session` (no new TCP+TLS handshake per fetch)
+- single-flight: concurrent requests for the same URL share one upstream call
+- exponential backoff on 429/5xx/network errors that follows `Retry-After`
+- latency and hit/miss counters for the admin/debug views
+"""
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimited(requests.HTTPError):
+    """Raised when the upstream still answers 429 after all retries."""
+
+    def __init__(self, retry_after, response=None):
+        self.retry_after = retry_after
+        super().__init__(f"429 Too Many Requests — try again after {retry_after}s", response=response)
+
+
+def parse_retry_after(value):
+    """Return the `Retry-After` header as seconds (it may be a number or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Call:
+    """One in-flight request that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class UpstreamClient:
+    def __init__(self, pool_size: int = 20, max_retries: int = 3,
+                 backoff_base: float = 0.5, max_backoff: float = 8.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._inflight: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)  # seconds, successful upstream calls only
+        self._counts = {"requests": 0, "coalesced": 0, "upstream_calls": 0, "retries": 0, "errors": 0}
+
+    # ---------- public API ----------
+    def get_json(self, url: str, headers=None, timeout: float = 10):
+        """GET `url` and return the decoded JSON. Raises `requests.RequestException` on failure."""
+        with self._lock:
+            self._counts["requests"] += 1
+            call = self._inflight.get(url)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[url] = call
+            else:
+                self._counts["coalesced"] += 1
+
+        if not leader:
+            # Someone else is already fetching this URL: wait for their answer
+            call.done.wait()
+        else:
+            try:
+                call.result = self._fetch_with_retries(url, headers, timeout)
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._inflight.pop(url, None)
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """Counters plus latency percentiles (ms) of recent upstream calls."""
+        with self._lock:
+            stats = dict(self._counts)
+            latencies = sorted(self._latencies)
+        stats["hit_rate"] = stats["coalesced"] / stats["requests"] if stats["requests"] else 0.0
+        for name, q in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[name] = round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+        return stats
+
+    # ---------- internals ----------
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        return min(self.max_backoff, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def _fetch_with_retries(self, url, headers, timeout):
+        attempt = 0
+        while True:
+            with self._lock:
+                self._counts["upstream_calls"] += 1
+            start = time.perf_counter()
+            try:
+                resp = self.session.get(url, headers=headers, timeout=timeout)
+            except requests.RequestException:
+                if attempt >= self.max_retries:
+                    self._count("errors")
+                    raise
+                wait = self._backoff(attempt)
+            else:
+                if resp.status_code not in RETRY_STATUSES:
+                    try:
+                        resp.raise_for_status()
+                        data = resp.json()
+                    except (requests.RequestException, ValueError):
+                        self._count("errors")
+                        raise
+                    with self._lock:
+                        self._latencies.append(time.perf_counter() - start)
+                    return data
+
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                # Don't hold a page hostage for a long Retry-After; report it instead
+                too_long = retry_after is not None and retry_after > self.max_backoff
+                if attempt >= self.max_retries or too_long:
+                    self._count("errors")
+                    if resp.status_code == 429:
+                        raise RateLimited(round(retry_after) if retry_after is not None else "a bit", response=resp)
+                    resp.raise_for_status()
+                wait = self._backoff(attempt, retry_after)
+
+            attempt += 1
+            self._count("retries")
+            time.sleep(wait)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> UpstreamClient:
+    """Return the single client shared by all sessions in this process."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = UpstreamClient()
+        return _client
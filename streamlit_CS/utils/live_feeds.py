@@ -0,0 +1,94 @@
+"""Fetch several live feeds at the same time, each with its own timeout.
+
+    for result in fetch_concurrently({"prices": load_prices, "weather": load_weather},
+                                     timeouts={"prices": 5, "weather": 8}):
+        draw(result)   # results arrive in completion order
+
+All loaders start together on a shared thread pool, so a page waits about as
+long as its slowest feed rather than the sum of all of them. Each result is
+yielded as soon as it is ready, so a page can draw the fast feeds while the
+slow ones are still loading. A feed that misses its timeout is reported as
+`timed_out`. Its thread keeps running, and whatever it fetches still lands
+in the caller's cache for the next run.
+
+A feed's timeout counts from when a worker picks it up, not from when it
+was queued, so a busy pool doesn't make feeds time out before they run. A
+feed still queued after MAX_QUEUE_WAIT seconds is cancelled and reported
+as timed out.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+MAX_WORKERS = 8
+MAX_QUEUE_WAIT = 30.0  # seconds a feed may wait for a free worker
+QUEUE_POLL = 0.05      # how often to look for queued feeds that have started
+
+
+class FeedResult(NamedTuple):
+    name: str
+    value: Any             # whatever the loader returned (None on error/timeout)
+    error: Optional[str]
+    elapsed: float         # seconds from start until the result (or the timeout)
+    timed_out: bool
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the pool shared by all sessions in this process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="live-feed")
+        return _executor
+
+
+def fetch_concurrently(sources: dict[str, Callable[[], Any]], timeouts) -> Iterator[FeedResult]:
+    """Run every loader in `sources` at once; yield a FeedResult per feed as each one finishes.
+
+    `timeouts` is one number of seconds for every feed, or a dict of seconds per feed name.
+    """
+    started = time.perf_counter()
+    limits = {name: timeouts[name] if isinstance(timeouts, dict) else timeouts for name in sources}
+    began = {}  # feed name -> perf_counter() when a worker started it
+
+    def timed(name, loader):
+        def run():
+            began[name] = time.perf_counter()
+            return loader()
+        return run
+
+    def deadline(name):
+        if name in began:
+            return began[name] + limits[name]
+        return started + MAX_QUEUE_WAIT
+
+    pending = {get_executor().submit(timed(name, loader)): name for name, loader in sources.items()}
+
+    while pending:
+        wait_for = min(deadline(name) for name in pending.values()) - time.perf_counter()
+        if any(name not in began for name in pending.values()):
+            wait_for = min(wait_for, QUEUE_POLL)  # a queued feed's deadline starts when it does
+        done, _ = wait(pending, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+        now = time.perf_counter()
+        for future in done:
+            name = pending.pop(future)
+            try:
+                value = future.result()
+                error = value[-1] if isinstance(value, tuple) else getattr(value, "error", None)
+            except Exception as e:
+                value, error = None, f"{type(e).__name__}: {e}"
+            yield FeedResult(name, value, error, now - started, False)
+        for future, name in list(pending.items()):
+            if deadline(name) > now:
+                continue
+            del pending[future]
+            if future.cancel():  # never got a worker
+                error = f"no free worker within {MAX_QUEUE_WAIT:.0f}s"
+            else:
+                error = f"no answer within {limits[name]:.0f}s"
+            yield FeedResult(name, None, error, now - started, True)
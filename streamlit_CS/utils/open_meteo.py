@@ -0,0 +1,159 @@
+"""Open-Meteo fetch + parse logic shared by the weather pages."""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+from utils.http_client import RateLimited, get_client
+
+API_BASE = os.environ.get("OPEN_METEO_API_BASE", "https://api.open-meteo.com/v1")  # overridable for local stubs
+INITIAL_PAST_HOURS = 7 * 24   # first fetch for a location: the past 7 days
+MAX_PAST_HOURS = 92 * 24      # Open-Meteo serves at most 92 past days
+BATCH_SIZE = 50               # coordinates per request (comma-separated lat/lon lists)
+MAX_WORKERS = 4               # concurrent batch requests
+
+LOCATIONS_PATH = Path(__file__).parent.parent / "data" / "locations.csv"
+
+_catching_up: set = set()  # locations a catch-up sync is running for
+_catching_up_lock = threading.Lock()
+
+
+def load_locations(path=LOCATIONS_PATH) -> pd.DataFrame:
+    """Location index: one row per site with `name`, `latitude`, `longitude`, indexed by name."""
+    return pd.read_csv(path).set_index("name", drop=False)
+
+
+# Documentation: https://open-meteo.com/en/docs
+def build_url(lat, lon, past_hours: int = INITIAL_PAST_HOURS):
+    """Combined API URL - fetch current conditions plus the last `past_hours` hourly rows.
+
+    `lat`/`lon` may be single values or equal-length lists (one batched request).
+    `timeformat=unixtime` returns epoch seconds (UTC), so no date-string parsing is needed.
+    """
+    if isinstance(lat, (list, tuple)):
+        lat, lon = ",".join(map(str, lat)), ",".join(map(str, lon))
+    return (
+        f"{API_BASE}/forecast?latitude={lat}&longitude={lon}"
+        "&current=temperature_2m,wind_speed_10m&hourly=temperature_2m,wind_speed_10m"
+        f"&past_hours={past_hours}&forecast_hours=1&timezone=auto&timeformat=unixtime"
+    )
+
+
+def _parse_location(data):
+    """Turn one location's JSON into (current_df, hourly_df) in that location's timezone."""
+    tz = data.get("timezone", "UTC")
+
+    # Parse current weather
+    current = data["current"]
+    current_df = pd.DataFrame([{
+        "time": pd.to_datetime(current["time"], unit="s", utc=True).tz_convert(tz),
+        "temperature (°C)": current["temperature_2m"],
+        "wind (km/h)": current["wind_speed_10m"]
+    }])
+
+    # Parse hourly weather
+    hourly = data["hourly"]
+    hourly_df = pd.DataFrame({
+        "time": pd.to_datetime(hourly["time"], unit="s", utc=True).tz_convert(tz),
+        "temperature (°C)": hourly["temperature_2m"],
+        "wind (km/h)": hourly["wind_speed_10m"]
+    })
+
+    # Filter to show only data up to current time (not future forecast)
+    now = pd.Timestamp.now(tz='UTC')
+    hourly_df = hourly_df[hourly_df['time'] <= now]
+    return current_df, hourly_df
+
+
+def fetch_weather_batch(url: str):
+    """Fetch one (possibly multi-location) URL. Returns (list of (current_df, hourly_df), error_message)."""
+    try:
+        # Shared pooled client: retries with backoff and coalesces concurrent misses
+        data = get_client().get_json(url, timeout=10)
+        # A single coordinate returns an object, several return a list in request order
+        items = data if isinstance(data, list) else [data]
+        return [_parse_location(item) for item in items], None
+    except RateLimited as e:
+        return None, str(e)
+    except requests.RequestException as e:
+        return None, f"Network/HTTP error: {e}"
+
+
+def _past_hours(last, now):
+    if last is None:
+        return INITIAL_PAST_HOURS
+    # +1 so the newest stored hour is re-fetched (it may have been revised)
+    return min(MAX_PAST_HOURS, max(1, math.ceil((now - last) / 3600) + 1))
+
+
+def sync_history(store, locations: pd.DataFrame):
+    """Fetch only the hours missing from `store` for every row of `locations` and append them.
+
+    Locations go out in batches of BATCH_SIZE, with up to MAX_WORKERS batches in
+    flight. Returns (current_df, error_message) where current_df is long-format
+    with a `location` column; read chart data back with `store.read_many`.
+    """
+    now = time.time()
+    last = store.last_times(list(locations["name"]))
+    batches = [locations.iloc[i:i + BATCH_SIZE] for i in range(0, len(locations), BATCH_SIZE)]
+
+    def run(batch):
+        # One past_hours per request: cover the location that is furthest behind
+        past_hours = max(_past_hours(last.get(name), now) for name in batch["name"])
+        url = build_url(list(batch["latitude"]), list(batch["longitude"]), past_hours)
+        return batch, fetch_weather_batch(url)
+
+    currents, errors = [], []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches)) or 1) as pool:
+        for batch, (parsed, err) in pool.map(run, batches):
+            if err:
+                errors.append(err)
+                continue
+            for name, (current_df, hourly_df) in zip(batch["name"], parsed):
+                store.append(name, hourly_df, str(current_df["time"].dt.tz))
+                currents.append(current_df.assign(
+                    location=name, time=current_df["time"].dt.tz_convert("UTC")))
+
+    if not currents:
+        return None, errors[0] if errors else "No locations selected"
+    current_df = pd.concat(currents, ignore_index=True)[["location", "time", "temperature (°C)", "wind (km/h)"]]
+    # Partial success still returns data; the error names what went missing
+    return current_df, (f"{len(errors)} of {len(batches)} batches failed: {errors[0]}" if errors else None)
+
+
+def catch_up_history(store, locations: pd.DataFrame, current_df, slack: float = 3600):
+    """Sync `store` for the locations in `current_df` (fetched by another replica) that it lags behind.
+
+    Adopting a peer's current conditions skips `sync_history` here, so a replica
+    with its own store would otherwise stop appending hours. Locations whose
+    newest stored hour is more than `slack` seconds older than their current
+    reading are synced on a background thread (only the missing hours). With
+    a shared WEATHER_DB_PATH nothing lags and nothing is fetched. Returns the
+    names being synced.
+    """
+    if current_df is None or current_df.empty:
+        return []
+    newest = current_df.groupby("location")["time"].max()
+    last = store.last_times(list(newest.index))
+    behind = [name for name, ts in newest.items()
+              if name in locations.index and ts.timestamp() - last.get(name, -math.inf) > slack]
+    with _catching_up_lock:
+        behind = [name for name in behind if name not in _catching_up]
+        _catching_up.update(behind)
+    if not behind:
+        return []
+
+    def run():
+        try:
+            sync_history(store, locations.loc[behind])
+        finally:
+            with _catching_up_lock:
+                _catching_up.difference_update(behind)
+
+    threading.Thread(target=run, name="weather-catch-up", daemon=True).start()
+    return behind
@@ -0,0 +1,171 @@
+"""Paged table: only the rows on screen are sent to the browser.
+
+`st.dataframe(df)` turns every row into Arrow and ships it all, even when
+nobody scrolls past row 20. `paged_table(df, key=...)` keeps the frame on the
+server and sends one page at a time:
+
+- Sorting and "contains" filtering run on the server. Each sort order
+  (one argsort per column/direction) and each filter match is computed once
+  per frame and reused by every session and rerun.
+- The row count ("Rows 51-100 of 12,345, filtered from 1,000,000") comes
+  from position arrays, so no rows are copied to get it.
+- The table is a fragment, so paging, sorting and filtering rerun only the
+  table and not the whole page.
+
+Frames no bigger than one page are shown as-is, with no controls.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = (25, 50, 100, 250)
+ANY_COLUMN = "(any column)"
+# Filter results kept per frame (each is one int array of matching positions)
+MAX_FILTERS = 32
+
+
+class TableView:
+    """Sort orders and filter matches for one frame, computed on demand and reused."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._orders: dict[tuple, np.ndarray] = {}
+        self._text: dict[str, pd.Series] = {}
+        self._matches: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    def summary(self) -> str:
+        """'244 rows × 7 columns: total_bill, tip, ...' without touching the rows."""
+        rows, cols = self.df.shape
+        return f"{rows:,} rows × {cols} columns: " + ", ".join(map(str, self.df.columns))
+
+    def order(self, column, ascending: bool = True) -> np.ndarray:
+        """Row positions sorted by `column` (stable, missing values last)."""
+        key = (column, ascending)
+        with self._lock:
+            if key in self._orders:
+                return self._orders[key]
+        values = self.df[column].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        with self._lock:
+            self._orders[key] = order
+        return order
+
+    def _as_text(self, column) -> pd.Series:
+        with self._lock:
+            if column in self._text:
+                return self._text[column]
+        text = self.df[column].reset_index(drop=True).astype(str).str.lower()
+        with self._lock:
+            self._text[column] = text
+        return text
+
+    def matches(self, query: str, column=None) -> np.ndarray:
+        """Sorted positions of rows where `column` (or any column) contains `query`, ignoring case."""
+        key = (query.lower(), column)
+        with self._lock:
+            if key in self._matches:
+                self._matches.move_to_end(key)
+                return self._matches[key]
+        columns = [column] if column is not None else list(self.df.columns)
+        mask = np.zeros(len(self.df), dtype=bool)
+        for col in columns:
+            mask |= self._as_text(col).str.contains(key[0], regex=False).to_numpy()
+        positions = np.flatnonzero(mask)
+        with self._lock:
+            self._matches[key] = positions
+            while len(self._matches) > MAX_FILTERS:
+                self._matches.popitem(last=False)
+        return positions
+
+    def rows(self, query: str = "", column=None, sort_by=None, ascending: bool = True) -> Optional[np.ndarray]:
+        """Positions to show, in display order; None means every row in frame order."""
+        if not query:
+            return None if sort_by is None else self.order(sort_by, ascending)
+        hits = self.matches(query, column)
+        if sort_by is None:
+            return hits
+        order = self.order(sort_by, ascending)
+        keep = np.zeros(len(self.df), dtype=bool)
+        keep[hits] = True
+        return order[keep[order]]
+
+    def window(self, positions: Optional[np.ndarray], start: int, stop: int) -> pd.DataFrame:
+        """Just the rows start..stop of `positions`: the only rows that get copied."""
+        if positions is None:
+            return self.df.iloc[start:stop]
+        return self.df.iloc[positions[start:stop]]
+
+
+# One view per frame object, so repeated calls with the same cached frame share
+# its sort orders and filter matches. Entries go away with their frame.
+_views: dict[int, tuple] = {}
+_views_lock = threading.Lock()
+
+
+def view_for(df: pd.DataFrame) -> TableView:
+    """The TableView for `df`, created on first use."""
+    key = id(df)
+    with _views_lock:
+        entry = _views.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        view = TableView(df)
+        _views[key] = (weakref.ref(df, lambda _, key=key: _views.pop(key, None)), view)
+        return view
+
+
+def paged_table(df: pd.DataFrame, key: str, page_size: int = PAGE_SIZES[0], **dataframe_kwargs):
+    """Show `df` one page at a time with server-side sort and filter. `key` must be unique on the page."""
+    if len(df) <= page_size:
+        st.dataframe(df, use_container_width=True, **dataframe_kwargs)
+        return
+    _paged_fragment(view_for(df), key, page_size, dataframe_kwargs)
+
+
+@st.fragment
+def _paged_fragment(view: TableView, key: str, page_size: int, dataframe_kwargs: dict):
+    columns = list(view.df.columns)
+    c1, c2, c3, c4, c5 = st.columns([2, 3, 2, 1, 1])
+    filter_col = c1.selectbox("Filter column", [ANY_COLUMN] + columns, key=f"{key}_filter_col")
+    query = c2.text_input("Contains", key=f"{key}_query", placeholder="type to filter rows")
+    sort_by = c3.selectbox("Sort by", ["(none)"] + columns, key=f"{key}_sort")
+    descending = c4.toggle("Desc", key=f"{key}_desc")
+    size = c5.selectbox("Rows", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+                        key=f"{key}_size")
+
+    positions = view.rows(
+        query.strip(),
+        column=None if filter_col == ANY_COLUMN else filter_col,
+        sort_by=None if sort_by == "(none)" else sort_by,
+        ascending=not descending,
+    )
+    total = len(view) if positions is None else len(positions)
+    pages = max(1, -(-total // size))
+
+    # New filter/sort/size: back to page 1. Never past the last page.
+    page_key = f"{key}_page"
+    signature = (filter_col, query, sort_by, descending, size)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[page_key] = 1
+    elif st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+
+    table = st.container()
+    p1, p2 = st.columns([1, 4], vertical_alignment="bottom")
+    page = p1.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * size
+    stop = min(start + size, total)
+    with table:
+        st.dataframe(view.window(positions, start, stop), use_container_width=True, **dataframe_kwargs)
+    filtered = f", filtered from {len(view):,}" if total != len(view) else ""
+    p2.caption(f"Rows {start + 1 if total else 0:,}–{stop:,} of {total:,}{filtered}")
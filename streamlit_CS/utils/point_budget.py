@@ -0,0 +1,55 @@
+"""Keep scatter charts responsive however many rows they get.
+
+- below `webgl_threshold` points: regular SVG scatter (crisp, fully interactive)
+- up to `density_threshold`: WebGL (`scattergl`), which the browser draws on the GPU
+- above that: a density heatmap binned on the server with NumPy, so the
+  payload is `bins * bins` cells instead of one entry per point
+
+Defaults can be changed with the SCATTER_WEBGL_THRESHOLD and
+SCATTER_DENSITY_THRESHOLD environment variables.
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+WEBGL_THRESHOLD = int(os.environ.get("SCATTER_WEBGL_THRESHOLD", 5_000))
+DENSITY_THRESHOLD = int(os.environ.get("SCATTER_DENSITY_THRESHOLD", 200_000))
+
+
+def scatter_mode(n_points: int, webgl_threshold: int = WEBGL_THRESHOLD,
+                 density_threshold: int = DENSITY_THRESHOLD) -> str:
+    """"svg", "webgl" or "density" for a chart of `n_points` points."""
+    if n_points > density_threshold:
+        return "density"
+    if n_points > webgl_threshold:
+        return "webgl"
+    return "svg"
+
+
+def density_figure(x, y, bins: int = 80, log_x: bool = False, labels: dict = None,
+                   x_name: str = "x", y_name: str = "y", title: str = None) -> go.Figure:
+    """2-D histogram of (x, y) as a heatmap; the counting happens here, not in the browser."""
+    labels = labels or {}
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        ok &= x > 0
+    x, y = x[ok], y[ok]
+    counts, x_edges, y_edges = np.histogram2d(np.log10(x) if log_x else x, y, bins=bins)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    fig = go.Figure(go.Heatmap(
+        x=10 ** x_centers if log_x else x_centers,
+        y=y_centers,
+        z=np.where(counts.T > 0, counts.T, np.nan),  # empty cells stay transparent
+        colorscale="Viridis",
+        colorbar=dict(title="Points"),
+        hovertemplate="x: %{x:.3g}<br>y: %{y:.3g}<br>points: %{z}<extra></extra>",
+    ))
+    fig.update_xaxes(title_text=labels.get(x_name, x_name), type="log" if log_x else "linear")
+    fig.update_yaxes(title_text=labels.get(y_name, y_name))
+    fig.update_layout(title=f"{title} · density of {len(x):,} points" if title else None)
+    return fig
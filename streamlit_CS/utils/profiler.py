@@ -0,0 +1,207 @@
+"""Opt-in render profiler for the pages.
+
+Turn it on for every session with `STREAMLIT_PROFILE=1`, or for one browser
+tab by adding `?profile=1` to the page URL. While it is on, each page run
+records:
+
+- named phases (`with prof.phase("build chart"):`), nested phases included
+- cache hits and misses: st.cache_* functions wrapped with `tracked`, plus
+  this repo's own caches (FigureCache, FileCache, the stale-while-revalidate
+  cache), which report through `record_cache`
+
+`prof.finish()` shows the numbers in a collapsible "⏱️ Render timings" panel
+and appends the run as one JSON line to PROFILE_LOG (data/profile_log.jsonl
+by default), so runs from before and after a change can be compared.
+When the profiler is off, `start` returns a stand-in whose methods do nothing.
+
+Either way, `start` also kicks off the process's background pre-warm and
+`finish` reports the page's first-run time to `utils.startup`.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from utils import startup
+
+logger = logging.getLogger(__name__)
+
+ENV_FLAG = "STREAMLIT_PROFILE"
+QUERY_PARAM = "profile"
+LOG_PATH = Path(os.environ.get("PROFILE_LOG", Path(__file__).parent.parent / "data" / "profile_log.jsonl"))
+
+_local = threading.local()  # the profile of the script run on this thread
+_log_lock = threading.Lock()
+
+
+def _truthy(value) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_enabled() -> bool:
+    if _truthy(os.environ.get(ENV_FLAG, "")):
+        return True
+    import streamlit as st
+    try:
+        return _truthy(st.query_params.get(QUERY_PARAM, ""))
+    except Exception:  # no script run context (bare mode, background thread)
+        return False
+
+
+class RenderProfile:
+    """Timings for one run of one page."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._depth = 0
+        self.phases = []   # {"name", "depth", "ms"} in start order
+        self.caches = []   # {"name", "hit", "ms"} in call order
+        self.total_ms = None
+
+    @contextmanager
+    def phase(self, name: str):
+        slot = len(self.phases)
+        self.phases.append({"name": name, "depth": self._depth, "ms": None})
+        self._depth += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases[slot]["ms"] = (time.perf_counter() - t0) * 1000
+
+    def cache(self, name: str, hit: bool, ms: float = None):
+        self.caches.append({"name": name, "hit": hit, "ms": ms})
+
+    def record(self) -> dict:
+        total = self.total_ms if self.total_ms is not None else (time.perf_counter() - self._t0) * 1000
+        return {
+            "ts": round(self.started_at, 3),
+            "page": self.page,
+            "total_ms": round(total, 2),
+            "phases": [{**p, "ms": None if p["ms"] is None else round(p["ms"], 2)} for p in self.phases],
+            "caches": [{**c, "ms": None if c["ms"] is None else round(c["ms"], 2)} for c in self.caches],
+        }
+
+    def finish(self):
+        """Stop the clock, log the run and draw the timing panel."""
+        self.total_ms = (time.perf_counter() - self._t0) * 1000
+        startup.record_first_run(self.page, self.total_ms)
+        if getattr(_local, "profile", None) is self:
+            _local.profile = None
+        record = self.record()
+        _append_log(record)
+        _show_panel(record)
+
+
+class _NullProfile:
+    """What `start` hands out while profiling is off (it only keeps the startup time)."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self._t0 = time.perf_counter()
+
+    def phase(self, name):
+        return nullcontext()
+
+    def cache(self, name, hit, ms=None):
+        pass
+
+    def finish(self):
+        startup.record_first_run(self.page, (time.perf_counter() - self._t0) * 1000)
+
+
+def start(page: str):
+    """Begin profiling this run of `page` (a no-op stand-in when profiling is off)."""
+    startup.prewarm()
+    if not is_enabled():
+        _local.profile = None
+        return _NullProfile(page)
+    _local.profile = RenderProfile(page)
+    return _local.profile
+
+
+def current():
+    """The profile of the run on this thread, or None."""
+    return getattr(_local, "profile", None)
+
+
+def record_cache(name: str, hit: bool, ms: float = None):
+    """Report a cache lookup to the current run's profile (if any)."""
+    prof = current()
+    if prof is not None:
+        prof.cache(name, hit, ms)
+
+
+def tracked(cache_decorator, name: str = None):
+    """Use in place of a Streamlit cache decorator to get hit/miss per call:
+
+        @tracked(st.cache_data(ttl=300))
+        def load(...): ...
+
+    A call counts as a miss when the function body actually ran.
+    """
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            _ran().append(label)
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            prof = current()
+            if prof is None:
+                return cached(*args, **kwargs)
+            ran = _ran()
+            mark = len(ran)
+            t0 = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                prof.cache(label, hit=label not in ran[mark:], ms=(time.perf_counter() - t0) * 1000)
+                del ran[mark:]
+
+        call.clear = cached.clear
+        return call
+    return wrap
+
+
+def _ran() -> list:
+    if not hasattr(_local, "ran"):
+        _local.ran = []
+    return _local.ran
+
+
+def _append_log(record: dict):
+    try:
+        with _log_lock:
+            LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+    except OSError as e:  # read-only deploys still get the panel
+        logger.warning("could not write %s: %s", LOG_PATH, e)
+
+
+def _show_panel(record: dict):
+    import streamlit as st
+
+    top_level = sum(p["ms"] or 0 for p in record["phases"] if p["depth"] == 0)
+    with st.expander(f"⏱️ Render timings — {record['total_ms']:.0f} ms"):
+        st.caption(f"{record['page']} · logged to `{LOG_PATH.name}`")
+        rows = [{"phase": " " * p["depth"] + p["name"], "ms": p["ms"]} for p in record["phases"]]
+        rows.append({"phase": "(outside named phases)", "ms": round(record["total_ms"] - top_level, 2)})
+        st.table(rows)
+        if record["caches"]:
+            hits = sum(c["hit"] for c in record["caches"])
+            st.caption(f"Cache lookups: {hits} hit / {len(record['caches']) - hits} miss")
+            st.table([{**c, "hit": "hit" if c["hit"] else "miss"} for c in record["caches"]])
@@ -0,0 +1,108 @@
+"""One shared background poller per upstream URL.
+
+Instead of every browser tab sleeping for `refresh_sec` and then fetching
+the API itself, a single daemon thread per URL refreshes the data on its
+own schedule. Pages only read the latest snapshot, so 50 viewers cost one
+upstream request per interval.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 10  # seconds; never poll an API faster than this
+
+
+class PollResult(NamedTuple):
+    value: Any
+    fetched_at: float  # time.time() of the fetch that produced `value`
+
+
+class BackgroundPoller:
+    """Calls `fetch()` every `interval` seconds on a daemon thread.
+
+    The thread stops by itself once nobody has read from it for
+    `idle_timeout` seconds; `get_poller` starts a fresh one on demand.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Any], interval: float, idle_timeout: float = 300):
+        self.name = name
+        self._fetch = fetch
+        self._interval = max(MIN_INTERVAL, interval)
+        self._idle_timeout = max(idle_timeout, 3 * self._interval)
+        self._latest: Optional[PollResult] = None
+        self._first_result = threading.Event()
+        self._wake = threading.Event()
+        self._last_access = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"poller:{name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def request_interval(self, seconds: float):
+        """Ask for updates at least every `seconds` (the fastest viewer wins)."""
+        seconds = max(MIN_INTERVAL, seconds)
+        if seconds < self._interval:
+            self._interval = seconds
+            self._idle_timeout = max(self._idle_timeout, 3 * seconds)
+            self._wake.set()
+
+    def touch(self):
+        """Mark the poller as still being watched."""
+        self._last_access = time.time()
+
+    def refresh_now(self):
+        """Wake the thread so it fetches immediately."""
+        self._wake.set()
+
+    def latest(self, wait: float = 15) -> Optional[PollResult]:
+        """Return the newest snapshot, waiting up to `wait` s for the very first fetch."""
+        self.touch()
+        if self._latest is None:
+            self._first_result.wait(wait)
+        return self._latest
+
+    def _run(self):
+        while True:
+            try:
+                value = self._fetch()
+            except Exception as e:  # keep the thread alive no matter what the fetcher does
+                value = None if self._latest is None else self._latest.value
+                logger.warning("poller %s: fetch failed: %s", self.name, e)
+            self._latest = PollResult(value, time.time())
+            self._first_result.set()
+
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if time.time() - self._last_access > self._idle_timeout:
+                return
+
+
+_pollers: dict[str, BackgroundPoller] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(key: str, fetch: Callable[[], Any], interval: float) -> BackgroundPoller:
+    """Return the process-wide poller for `key`, starting it if needed.
+
+    The registry is shared by every page, so prefix keys with the feed (e.g. "coingecko-prices:bitcoin").
+    """
+    with _pollers_lock:
+        # Pollers stop once nobody watches them; forget those so old keys don't pile up
+        for stopped in [k for k, p in _pollers.items() if not p.is_alive()]:
+            del _pollers[stopped]
+        poller = _pollers.get(key)
+        if poller is None or not poller.is_alive():
+            poller = BackgroundPoller(key, fetch, interval)
+            _pollers[key] = poller
+        else:
+            poller.request_interval(interval)
+        poller.touch()
+        return poller
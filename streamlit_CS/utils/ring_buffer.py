@@ -0,0 +1,114 @@
+"""Fixed-size, NumPy-backed ring buffers for rolling price history.
+
+Each poll writes one (timestamp, value) pair into preallocated arrays, so
+memory stays bounded however long the app runs and nothing is rebuilt per
+tick; readers get ordered copies only when they draw a chart. Each poll also
+updates the coin's rolling 24 h / 7 d statistics (see utils/rolling_stats.py).
+"""
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from utils.rolling_stats import SeriesStats, StatsRegistry
+
+
+class RingBuffer:
+    """Fixed-capacity ring of float64 (timestamp, value) pairs."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = np.full(capacity, np.nan)
+        self._values = np.full(capacity, np.nan)
+        self._next = 0      # slot the next append writes to
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, ts: float, value: float):
+        self._times[self._next] = ts
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered(self, arr):
+        if self._count < self.capacity:
+            return arr[:self._count].copy()
+        return np.concatenate((arr[self._next:], arr[:self._next]))
+
+    def times(self) -> np.ndarray:
+        """Timestamps, oldest first."""
+        return self._ordered(self._times)
+
+    def values(self) -> np.ndarray:
+        """Values, oldest first."""
+        return self._ordered(self._values)
+
+    def last(self):
+        return self._values[self._next - 1] if self._count else np.nan
+
+    def last_time(self):
+        return self._times[self._next - 1] if self._count else np.nan
+
+    def first(self):
+        if not self._count:
+            return np.nan
+        return self._values[0] if self._count < self.capacity else self._values[self._next]
+
+    def pct_change(self):
+        """Percent change from the oldest to the newest value in the window."""
+        first = self.first()
+        return (self.last() - first) / first * 100 if first else np.nan
+
+
+class PriceHistory:
+    """One RingBuffer per coin, shared by every session.
+
+    At most `max_series` coins are tracked; the one updated least recently is
+    dropped first, so total memory is bounded by max_series * capacity.
+    """
+
+    def __init__(self, capacity: int = 720, max_series: int = 500, stats_resolution: float = 300):
+        self.capacity = capacity
+        self.max_series = max_series
+        self._series: dict[str, RingBuffer] = {}
+        # Rolling stats keep at most one point per `stats_resolution` seconds, so a
+        # 7-day window stays small however often the coin is polled
+        self._stats = StatsRegistry(max_series, resolution=stats_resolution)
+        self._lock = threading.Lock()
+
+    def record(self, prices: dict, ts: float = None):
+        """Append one poll, e.g. `{"bitcoin": 68000.0, "ethereum": 3500.0}`."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for coin, price in prices.items():
+                buf = self._series.pop(coin, None) or RingBuffer(self.capacity)
+                if ts > (buf.last_time() if len(buf) else -np.inf):
+                    buf.append(ts, price)
+                    self._stats.get(coin).push(ts, price)
+                self._series[coin] = buf  # re-insert = most recently updated
+            while len(self._series) > self.max_series:
+                self._series.pop(next(iter(self._series)))
+
+    def get(self, coin: str):
+        with self._lock:
+            return self._series.get(coin)
+
+    def snapshot(self, coin: str):
+        """(times, values) ordered copies for one coin, or empty arrays."""
+        with self._lock:
+            buf = self._series.get(coin)
+            if buf is None:
+                return np.empty(0), np.empty(0)
+            return buf.times(), buf.values()
+
+    def stats(self, coin: str) -> Optional[SeriesStats]:
+        """Rolling 24 h / 7 d statistics for one coin, or None before its first poll."""
+        return self._stats.peek(coin)
+
+    def pct_changes(self, coins):
+        """Percent change across the window for each coin that has history."""
+        with self._lock:
+            return {c: self._series[c].pct_change() for c in coins if c in self._series}
@@ -0,0 +1,188 @@
+"""Incremental rolling statistics over time windows (24 h, 7 d) for live feeds.
+
+Each new point updates every window in O(1) amortised time, however long
+the history is:
+
+- a deque holds the points still inside the window, and points that fall
+  out are dropped from the front;
+- running sums of x and x² give the mean and standard deviation;
+- monotonic deques give the min and max (each point is pushed and popped
+  at most once).
+
+`SeriesStats` keeps one series' windows together with the day-over-day
+change and a z-score anomaly flag against the 7-day baseline. It also
+records a bounded trace of the rolling values for chart overlays. Feed it
+only the points newer than `last_time` and the history is never rescanned.
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Optional
+
+import numpy as np
+
+WINDOWS = {"24h": 24 * 3600, "7d": 7 * 24 * 3600}
+BASELINE = "7d"        # window the z-score is measured against
+Z_THRESHOLD = 3.0      # |z| above this is flagged as an anomaly
+MIN_BASELINE = 12      # points needed in the baseline before flagging anything
+
+
+class RollingWindow:
+    """Mean / std / min / max of the points from the last `span` seconds (span inclusive)."""
+
+    def __init__(self, span: float):
+        self.span = span
+        self._points: deque = deque()    # (ts, value), oldest first
+        self._mins: deque = deque()      # increasing values: front is the min
+        self._maxs: deque = deque()      # decreasing values: front is the max
+        self._shift = None               # first value seen; keeps the sums small
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def __len__(self):
+        return len(self._points)
+
+    def push(self, ts: float, value: float):
+        if self._shift is None:
+            self._shift = value
+        d = value - self._shift
+        self._points.append((ts, value))
+        self._sum += d
+        self._sumsq += d * d
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((ts, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((ts, value))
+        self._evict(ts - self.span)
+
+    def _evict(self, cutoff: float):
+        while self._points and self._points[0][0] < cutoff:
+            _, old = self._points.popleft()
+            d = old - self._shift
+            self._sum -= d
+            self._sumsq -= d * d
+        while self._mins[0][0] < cutoff:
+            self._mins.popleft()
+        while self._maxs[0][0] < cutoff:
+            self._maxs.popleft()
+
+    @property
+    def mean(self) -> float:
+        n = len(self._points)
+        return self._shift + self._sum / n if n else math.nan
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (NaN below two points)."""
+        n = len(self._points)
+        if n < 2:
+            return math.nan
+        return math.sqrt(max(0.0, (self._sumsq - self._sum * self._sum / n) / (n - 1)))
+
+    @property
+    def min(self) -> float:
+        return self._mins[0][1] if self._mins else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._maxs[0][1] if self._maxs else math.nan
+
+    @property
+    def oldest(self):
+        """(ts, value) of the oldest point still in the window, or None."""
+        return self._points[0] if self._points else None
+
+    def zscore(self, value: float) -> float:
+        std = self.std
+        return (value - self.mean) / std if std > 0 else math.nan
+
+
+class SeriesStats:
+    """Rolling windows, day-over-day change and anomaly flags for one series.
+
+    `resolution` (seconds) thins fast feeds: a point closer than that to the
+    previous one is skipped. `trace_len` bounds the overlay trace.
+    """
+
+    def __init__(self, windows: dict = WINDOWS, resolution: float = 0, trace_len: int = 2200):
+        self.windows = {name: RollingWindow(span) for name, span in windows.items()}
+        self.resolution = resolution
+        self.last_time = -math.inf
+        self.last_value = math.nan
+        self.last_z = math.nan
+        self._trace = deque(maxlen=trace_len)      # (ts, value, mean_24h, min_24h, max_24h)
+        self._anomalies = deque(maxlen=trace_len)  # (ts, value, z)
+        self._lock = threading.Lock()
+
+    def push(self, ts: float, value: float):
+        """Add one point. Points not newer than `last_time` (or NaN) are ignored."""
+        if value is None or value != value:
+            return
+        with self._lock:
+            if ts < self.last_time + max(self.resolution, 1e-9):
+                return
+            baseline = self.windows[BASELINE]
+            # Scored against the baseline before the point joins it, so a spike can't dilute itself
+            z = baseline.zscore(value) if len(baseline) >= MIN_BASELINE else math.nan
+            for window in self.windows.values():
+                window.push(ts, value)
+            self.last_time, self.last_value, self.last_z = ts, value, z
+            day = self.windows["24h"]
+            self._trace.append((ts, value, day.mean, day.min, day.max))
+            if abs(z) > Z_THRESHOLD:
+                self._anomalies.append((ts, value, z))
+
+    def extend(self, times, values):
+        for ts, value in zip(times, values):
+            self.push(float(ts), float(value))
+
+    def summary(self) -> dict:
+        """Latest value, per-window mean/std/min/max/count, 24 h delta and z-score."""
+        with self._lock:
+            out = {"last": self.last_value, "time": self.last_time, "z": self.last_z,
+                   "anomaly": abs(self.last_z) > Z_THRESHOLD}
+            for name, w in self.windows.items():
+                out[name] = {"mean": w.mean, "std": w.std, "min": w.min, "max": w.max, "count": len(w)}
+            oldest = self.windows["24h"].oldest
+            # Day-over-day: against the oldest point of the 24 h window, once it reaches back most of a day
+            covered = oldest is not None and self.last_time - oldest[0] >= 0.9 * self.windows["24h"].span
+            out["delta_24h"] = self.last_value - oldest[1] if covered else math.nan
+            out["delta_24h_pct"] = out["delta_24h"] / oldest[1] * 100 if covered and oldest[1] else math.nan
+            return out
+
+    def trace(self, since: float = -math.inf) -> dict:
+        """Arrays (oldest first) of time/value/24 h mean/min/max, plus anomaly points, for overlays."""
+        with self._lock:
+            rows = [r for r in self._trace if r[0] >= since]
+            flagged = [a for a in self._anomalies if a[0] >= since]
+        cols = np.array(rows, dtype=float).reshape(-1, 5).T
+        flags = np.array(flagged, dtype=float).reshape(-1, 3).T
+        return {"time": cols[0], "value": cols[1], "mean": cols[2], "min": cols[3], "max": cols[4],
+                "anomaly_time": flags[0], "anomaly_value": flags[1], "anomaly_z": flags[2]}
+
+
+class StatsRegistry:
+    """SeriesStats per key (e.g. (location, column)), shared by every session.
+
+    At most `max_series` are kept; the one used least recently is dropped first.
+    """
+
+    def __init__(self, max_series: int = 500, **series_kwargs):
+        self.max_series = max_series
+        self.series_kwargs = series_kwargs
+        self._series: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> SeriesStats:
+        with self._lock:
+            stats = self._series.pop(key, None) or SeriesStats(**self.series_kwargs)
+            self._series[key] = stats
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+            return stats
+
+    def peek(self, key) -> Optional[SeriesStats]:
+        with self._lock:
+            return self._series.get(key)
@@ -0,0 +1,230 @@
+"""Cache backend shared by every server process (replica) that can see it.
+
+Each Streamlit replica keeps its own memory, so without this every replica
+calls CoinGecko and Open-Meteo on its own and hits the rate limits N times
+as fast. A backend stores loader results (pickled) with the time they were
+fetched. Any replica can then reuse them within the same TTLs the pages
+already use: 300 s for prices, 600 s for weather, a day for the coin list.
+
+Backends are picked with SHARED_CACHE_URL:
+
+- sqlite:///path/to/cache.sqlite  (default: data/shared_cache.sqlite): one
+  WAL-mode file. It works for any number of processes on a host, or for
+  containers that mount the same volume.
+- memory://  per process only (what the app did before)
+- none       no shared caching
+
+More backends (LMDB, Redis, ...) plug in with `register_backend(scheme, factory)`.
+A backend also hands out short leases, so when a key goes stale on every
+replica at once only one of them refreshes it while the others wait for the
+result. Backend failures are logged and treated as misses, so the pages
+never depend on the cache being reachable.
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = f"sqlite:///{Path(__file__).parent.parent / 'data' / 'shared_cache.sqlite'}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    value      BLOB NOT NULL,     -- pickled loader result
+    stored_at  REAL NOT NULL,     -- when the value was fetched (epoch seconds)
+    expires_at REAL NOT NULL      -- after this it is never served
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at);
+CREATE TABLE IF NOT EXISTS leases (
+    key    TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    until  REAL NOT NULL
+);
+"""
+
+
+class Shared(NamedTuple):
+    value: Any
+    stored_at: float
+
+
+class MemoryBackend:
+    """In-process backend: the interface every backend implements."""
+
+    def __init__(self):
+        self._entries: dict[str, tuple] = {}
+        self._leases: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, newer_than: float = None) -> Optional[Shared]:
+        """The stored value, or None if missing, expired or not stored after `newer_than`."""
+        with self._lock:
+            item = self._entries.get(key)
+        if item is None or item[2] < time.time() or (newer_than is not None and item[1] <= newer_than):
+            return None
+        return Shared(item[0], item[1])
+
+    def set(self, key: str, value, stored_at: float, keep_for: float):
+        """Store `value` (fetched at `stored_at`) and drop it `keep_for` seconds later."""
+        with self._lock:
+            self._entries[key] = (value, stored_at, stored_at + keep_for)
+
+    def lease(self, key: str, holder: str, seconds: float) -> bool:
+        """Try to become the one process refreshing `key` for the next `seconds`."""
+        now = time.time()
+        with self._lock:
+            current = self._leases.get(key)
+            if current and current[0] != holder and current[1] > now:
+                return False
+            self._leases[key] = (holder, now + seconds)
+            return True
+
+    def release(self, key: str, holder: str):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == holder:
+                del self._leases[key]
+
+
+class SQLiteBackend:
+    """One SQLite file (WAL mode) shared by every process that opens it."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, newer_than: float = None) -> Optional[Shared]:
+        # The stored_at test runs in SQL, so a copy we already have is never read or unpickled
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM entries WHERE key = ? AND expires_at >= ? AND stored_at > ?",
+                (key, time.time(), -1.0 if newer_than is None else newer_than),
+            ).fetchone()
+        return None if row is None else Shared(pickle.loads(row[0]), row[1])
+
+    def set(self, key: str, value, stored_at: float, keep_for: float):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            # Keep whichever copy is newer if two replicas finish at once
+            self._conn.execute(
+                "INSERT INTO entries (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at, "
+                "expires_at = excluded.expires_at WHERE excluded.stored_at > entries.stored_at",
+                (key, blob, stored_at, stored_at + keep_for),
+            )
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+
+    def lease(self, key: str, holder: str, seconds: float) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO leases (key, holder, until) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET holder = excluded.holder, until = excluded.until "
+                "WHERE leases.until < ? OR leases.holder = excluded.holder",
+                (key, holder, now + seconds, now),
+            )
+            return cur.rowcount == 1
+
+    def release(self, key: str, holder: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND holder = ?", (key, holder))
+
+
+BACKENDS: dict[str, Callable[[str], Any]] = {
+    "sqlite": lambda rest: SQLiteBackend(rest[1:] if rest.startswith("/") else rest),  # sqlite:///abs/path
+    "memory": lambda rest: MemoryBackend(),
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], Any]):
+    """Make SHARED_CACHE_URL=`scheme`://... build a backend with `factory(rest_of_url)`."""
+    BACKENDS[scheme] = factory
+
+
+def open_backend(url: str):
+    """Backend for `url`, or None for `none`/empty."""
+    if not url or url.strip().lower() in ("none", "off", "0"):
+        return None
+    scheme, _, rest = url.partition("://")
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown SHARED_CACHE_URL scheme {scheme!r} (known: {', '.join(BACKENDS)})")
+    return BACKENDS[scheme](rest)
+
+
+# Identifies this process when taking leases
+HOLDER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_backend = None
+_backend_ready = False
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the backend shared by all sessions in this process (None if disabled or broken)."""
+    global _backend, _backend_ready
+    with _backend_lock:
+        if not _backend_ready:
+            url = os.environ.get("SHARED_CACHE_URL", DEFAULT_URL)
+            try:
+                _backend = open_backend(url)
+            except (OSError, sqlite3.Error, ValueError) as e:
+                logger.warning("shared cache disabled, could not open %s: %s", url, e)
+                _backend = None
+            _backend_ready = True
+        return _backend
+
+
+def safe_get(backend, key: str, newer_than: float = None) -> Optional[Shared]:
+    try:
+        return backend.get(key, newer_than)
+    except Exception as e:  # locked/corrupt/unpicklable: behave like a miss
+        logger.warning("get %s failed: %s", key, e)
+        return None
+
+
+def safe_set(backend, key: str, value, stored_at: float, keep_for: float):
+    try:
+        backend.set(key, value, stored_at, keep_for)
+    except Exception as e:
+        logger.warning("set %s failed: %s", key, e)
+
+
+def safe_lease(backend, key: str, seconds: float) -> bool:
+    try:
+        return backend.lease(key, HOLDER, seconds)
+    except Exception as e:  # can't coordinate: fetch ourselves
+        logger.warning("lease %s failed: %s", key, e)
+        return True
+
+
+def safe_release(backend, key: str):
+    try:
+        backend.release(key, HOLDER)
+    except Exception as e:
+        logger.warning("release %s failed: %s", key, e)
+
+
+def remember(key: str, ttl: float, loader: Callable[[], Any]):
+    """`loader()` through the shared backend: a result younger than `ttl` from any process is reused.
+
+    Results whose last item is an error (the repo's `(..., error_message)` convention) are not shared.
+    """
+    backend = get_backend()
+    if backend is not None:
+        shared = safe_get(backend, key)
+        if shared is not None and time.time() - shared.stored_at < ttl:
+            return shared.value
+    value = loader()
+    if backend is not None and not (isinstance(value, tuple) and value[-1]):
+        safe_set(backend, key, value, time.time(), ttl)
+    return value
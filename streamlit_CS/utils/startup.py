@@ -0,0 +1,100 @@
+"""Cold-start help: background pre-warm and per-page startup times.
+
+Streamlit has no server-boot hook, so the first script run in a process
+(whichever page the first visitor opens) starts `prewarm()`. One daemon
+thread then, in order:
+
+1. imports plotly.express and draws a throwaway figure, which loads
+   Plotly's templates and validators once
+2. builds the on-disk Arrow copies of the bundled datasets and the CSVs in
+   data/ (plus PIE_DATA_PATH / STUDENT_DATA_PATH if set), so the first
+   visit to those pages only memory-maps them. Files over
+   LARGE_FILE_BYTES are skipped, so a multi-GB export is never loaded whole
+   at boot (the pie page only streams those).
+
+Pages keep their heavy imports inside the functions that draw charts, so a
+page that is served from cached figures never pays for them at all.
+`record_first_run` notes how long each page's first run in this process
+took; `report()` returns those numbers for the home page.
+Set PREWARM=0 to turn the warm-up off.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+BOOT = time.time()  # first script run in this process (closest thing to server boot)
+_lock = threading.Lock()
+_thread = None
+_status = {"state": "off", "imports_ms": None, "datasets_ms": None, "finished_after_s": None, "errors": []}
+_first_runs = {}  # page -> {"page", "first_run_ms", "after_boot_s", "prewarmed"}
+
+
+def _warm_imports():
+    import plotly.express as px
+
+    px.scatter(x=[0, 1], y=[0, 1]).to_dict()
+
+
+def _warm_datasets():
+    from utils.csv_aggregate import LARGE_FILE_BYTES
+    from utils.datasets import load_bundled, read_csv_columnar
+
+    load_bundled("tips")
+    load_bundled("gapminder")
+    paths = sorted(DATA_DIR.glob("*.csv"))
+    paths += [Path(os.environ[var]) for var in ("PIE_DATA_PATH", "STUDENT_DATA_PATH") if os.environ.get(var)]
+    for path in paths:
+        if path.stat().st_size <= LARGE_FILE_BYTES:
+            read_csv_columnar(path)
+
+
+def _run():
+    for key, step in (("imports_ms", _warm_imports), ("datasets_ms", _warm_datasets)):
+        t0 = time.perf_counter()
+        try:
+            step()
+        except Exception as e:  # a missing file must not stop the rest of the warm-up
+            _status["errors"].append(f"{key[:-3]}: {type(e).__name__}: {e}")
+        _status[key] = round((time.perf_counter() - t0) * 1000, 1)
+    _status["finished_after_s"] = round(time.time() - BOOT, 2)
+    _status["state"] = "done"
+    logger.info("pre-warm done: imports %s ms, datasets %s ms", _status["imports_ms"], _status["datasets_ms"])
+
+
+def prewarm():
+    """Start the background warm-up once per process (no-op when PREWARM=0)."""
+    global _thread
+    if os.environ.get("PREWARM", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    with _lock:
+        if _thread is not None:
+            return
+        _status["state"] = "running"
+        _thread = threading.Thread(target=_run, name="prewarm", daemon=True)
+        _thread.start()
+
+
+def record_first_run(page: str, ms: float):
+    """Keep the duration of `page`'s first run in this process (later runs are ignored)."""
+    with _lock:
+        if page in _first_runs:
+            return
+        _first_runs[page] = {
+            "page": page,
+            "first_run_ms": round(ms, 1),
+            "after_boot_s": round(time.time() - BOOT, 2),
+            "prewarmed": _status["state"] == "done",
+        }
+    logger.info("%s: first run %.0f ms", page, ms)
+
+
+def report():
+    """(first-run rows in visit order, pre-warm status)."""
+    with _lock:
+        return list(_first_runs.values()), dict(_status)
@@ -0,0 +1,208 @@
+"""Stale-while-revalidate cache with a last-known-good value per key.
+
+- fresh (age < ttl): served straight from memory
+- stale (ttl <= age < max_stale): served right away while one background
+  thread refreshes it, so no visitor waits on the upstream timeout
+- missing or older than max_stale: the caller blocks on a refresh
+
+A failed refresh never replaces the last good value. After a failure the
+key is not retried for `error_ttl` seconds, so an upstream outage costs one
+retry chain per key per `error_ttl` rather than one per render.
+
+At most `max_entries` keys are kept (least recently read dropped first), and
+keys whose value has aged past max_stale are dropped when new keys arrive.
+
+With a shared `backend` (utils.shared_cache), every good value is also
+written there. A process with nothing fresh first adopts a newer value
+another replica stored, and only calls the loader if there is none. While
+one replica holds the refresh lease for a key, the others wait for its
+result instead of calling upstream as well. Loaders follow this
+repo's `(..., error_message)` convention: the last tuple item is the error
+(None on success), e.g. `fetch_prices` returns `(df, err)`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+from utils.profiler import record_cache
+from utils.shared_cache import safe_get, safe_lease, safe_release, safe_set
+
+
+class CacheResult(NamedTuple):
+    value: Any                # last good loader result, or None if there is none within max_stale
+    fetched_at: Optional[float]
+    age: Optional[float]      # seconds since `fetched_at`
+    stale: bool               # True when older than ttl (a refresh is running or was attempted)
+    error: Optional[str]      # error from the most recent failed refresh, if any
+
+
+class _Entry:
+    def __init__(self):
+        self.value = None
+        self.fetched_at = None
+        self.error = None
+        self.failed_at = None          # time.time() of the last failed refresh
+        self.lock = threading.Lock()   # one refresh per key at a time
+        self.refreshing = False
+
+
+def _error_of(value):
+    return value[-1] if isinstance(value, tuple) else None
+
+
+class StaleWhileRevalidateCache:
+    def __init__(self, ttl: float, max_stale: float, backend=None, namespace: str = "",
+                 on_shared: Callable[[Any, float], None] = None, share_window: float = 10.0,
+                 lease_wait: float = 15.0, error_ttl: float = 30.0, max_entries: int = 256):
+        """`on_shared(value, fetched_at)` runs when a value from another process is adopted;
+        `share_window` is how recent another process's result must be to count as our refresh."""
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.backend = backend
+        self.namespace = namespace
+        self.on_shared = on_shared
+        self.share_window = share_window
+        self.lease_wait = lease_wait
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, key) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            entry = self._entries[key] = _Entry()
+            self._prune()
+            return entry
+
+    def _prune(self):
+        """Drop expired keys, then the least recently read ones past max_entries (call with _lock held)."""
+        now = time.time()
+        for key, entry in list(self._entries.items()):
+            expired = entry.fetched_at is not None and now - entry.fetched_at >= self.max_stale
+            if expired and not entry.refreshing and not entry.lock.locked():
+                del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _backing_off(self, entry: _Entry) -> bool:
+        """True while the key's last refresh failed less than error_ttl seconds ago."""
+        return entry.failed_at is not None and time.time() - entry.failed_at < self.error_ttl
+
+    def get(self, key: str, loader: Callable[[], Any]) -> CacheResult:
+        entry = self._entry(key)
+        age = None if entry.fetched_at is None else time.time() - entry.fetched_at
+        if self.backend is not None and (age is None or age >= self.ttl):
+            # Another replica may already have something newer (skip if a refresh is running here)
+            if entry.lock.acquire(blocking=False):
+                try:
+                    if self._pull(key, entry):
+                        age = time.time() - entry.fetched_at
+                finally:
+                    entry.lock.release()
+
+        if age is not None and age < self.ttl:
+            record_cache(f"swr:{key}", hit=True)
+            return self._result(entry)
+        if age is not None and age < self.max_stale:
+            record_cache(f"swr:{key} (stale)", hit=True)
+            if not self._backing_off(entry):
+                self._refresh_in_background(key, entry, loader)
+            return self._result(entry)
+        if self._backing_off(entry):
+            # Failed moments ago: report that error instead of running the retries again
+            record_cache(f"swr:{key} (failed)", hit=True)
+            return self._result(entry)
+
+        # Nothing usable: wait for a refresh (concurrent callers share it)
+        t0 = time.perf_counter()
+        self.refresh(key, loader)
+        record_cache(f"swr:{key}", hit=False, ms=(time.perf_counter() - t0) * 1000)
+        return self._result(entry)
+
+    def refresh(self, key: str, loader: Callable[[], Any]):
+        """Run `loader` now and keep its result if it succeeded."""
+        entry = self._entry(key)
+        started = time.time()
+        with entry.lock:
+            # Another thread refreshed while we waited for the lock
+            if entry.fetched_at is not None and entry.fetched_at >= started:
+                return
+            # ... or failed while we waited: share that failure instead of retrying in turn
+            if entry.failed_at is not None and entry.failed_at >= started:
+                return
+            # ... or another process did, just now
+            if self._pull(key, entry) and entry.fetched_at >= started - self.share_window:
+                return
+            leased = self.backend is None or safe_lease(self.backend, self._shared_key(key), self.lease_wait)
+            if not leased and self._wait_for_peer(key, entry, started):
+                return
+            try:
+                value = loader()
+                error = _error_of(value)
+            except Exception as e:
+                value, error = None, f"{type(e).__name__}: {e}"
+            finally:
+                if self.backend is not None and leased:
+                    safe_release(self.backend, self._shared_key(key))
+            if error is None:
+                entry.value, entry.fetched_at, entry.failed_at = value, time.time(), None
+                if self.backend is not None:
+                    safe_set(self.backend, self._shared_key(key), value, entry.fetched_at, self.max_stale)
+            else:
+                entry.failed_at = time.time()
+            entry.error = error
+
+    def _shared_key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _pull(self, key, entry) -> bool:
+        """Adopt a newer good value stored by another process (call with entry.lock held)."""
+        if self.backend is None:
+            return False
+        # Only a copy stored after ours is read back (and unpickled)
+        shared = safe_get(self.backend, self._shared_key(key), newer_than=entry.fetched_at)
+        if shared is None:
+            return False
+        entry.value, entry.fetched_at, entry.error, entry.failed_at = shared.value, shared.stored_at, None, None
+        if self.on_shared is not None:
+            self.on_shared(shared.value, shared.stored_at)
+        return True
+
+    def _wait_for_peer(self, key, entry, started) -> bool:
+        """Another process holds the refresh lease: wait (up to lease_wait) for what it stores."""
+        deadline = time.time() + self.lease_wait
+        while time.time() < deadline:
+            time.sleep(0.2)
+            if self._pull(key, entry) and entry.fetched_at >= started - self.share_window:
+                return True
+        return False
+
+    def _refresh_in_background(self, key, entry, loader):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def run():
+            try:
+                self.refresh(key, loader)
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=run, name=f"swr:{key[:40]}", daemon=True).start()
+
+    def _result(self, entry: _Entry) -> CacheResult:
+        if entry.fetched_at is None:
+            return CacheResult(None, None, None, True, entry.error)
+        age = time.time() - entry.fetched_at
+        if age >= self.max_stale:
+            return CacheResult(None, entry.fetched_at, age, True, entry.error)
+        return CacheResult(entry.value, entry.fetched_at, age, age >= self.ttl, entry.error)
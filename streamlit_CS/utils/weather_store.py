@@ -0,0 +1,126 @@
+"""Append-only SQLite store for hourly weather history.
+
+Rows are keyed by (location, time_utc) and partitioned by UTC day, so a
+refresh only needs to fetch and insert the hours since the newest stored
+timestamp, and history can grow past the 7 days a single request returns.
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+EPOCH = pd.Timestamp(0, tz="UTC")
+DEFAULT_PATH = Path(os.environ.get("WEATHER_DB_PATH", Path(__file__).parent.parent / "data" / "weather_history.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hourly (
+    location    TEXT    NOT NULL,
+    day         TEXT    NOT NULL,  -- UTC date, e.g. 2025-10-22 (partition key)
+    time_utc    INTEGER NOT NULL,  -- epoch seconds
+    temperature REAL,
+    wind        REAL,
+    PRIMARY KEY (location, time_utc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hourly_location_day ON hourly (location, day);
+CREATE TABLE IF NOT EXISTS locations (
+    location TEXT PRIMARY KEY,
+    timezone TEXT NOT NULL
+);
+"""
+
+
+class HourlyStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def last_time(self, location: str):
+        """Newest stored epoch second for `location`, or None if nothing is stored yet."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(time_utc) FROM hourly WHERE location = ?", (location,)
+            ).fetchone()
+        return row[0]
+
+    def last_times(self, locations) -> dict:
+        """Newest stored epoch second per location (locations with no rows are left out)."""
+        marks = ",".join("?" * len(locations))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT location, MAX(time_utc) FROM hourly WHERE location IN ({marks}) GROUP BY location",
+                list(locations),
+            ).fetchall()
+        return dict(rows)
+
+    def timezone(self, location: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT timezone FROM locations WHERE location = ?", (location,)
+            ).fetchone()
+        return row[0] if row else "UTC"
+
+    def append(self, location: str, hourly_df: pd.DataFrame, timezone: str = "UTC"):
+        """Insert new hours (tz-aware `time` column); hours already stored are overwritten."""
+        if hourly_df is None or hourly_df.empty:
+            return 0
+        times = hourly_df["time"].dt.tz_convert("UTC")
+        rows = zip(
+            [location] * len(hourly_df),
+            times.dt.strftime("%Y-%m-%d"),
+            (times - EPOCH) // pd.Timedelta(seconds=1),
+            hourly_df["temperature (°C)"].astype(float),
+            hourly_df["wind (km/h)"].astype(float),
+        )
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO hourly VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO locations VALUES (?, ?)", (location, timezone))
+        return len(hourly_df)
+
+    def read(self, location: str, since_utc: int = 0) -> pd.DataFrame:
+        """Hourly rows for `location` newer than `since_utc`, in the location's own timezone."""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT time_utc, temperature, wind FROM hourly"
+                " WHERE location = ? AND time_utc >= ? ORDER BY time_utc",
+                self._conn, params=(location, int(since_utc)),
+            )
+        return pd.DataFrame({
+            "time": pd.to_datetime(df["time_utc"], unit="s", utc=True).dt.tz_convert(self.timezone(location)),
+            "temperature (°C)": df["temperature"],
+            "wind (km/h)": df["wind"],
+        })
+
+    def read_many(self, locations, since_utc: int = 0) -> pd.DataFrame:
+        """Long-format hourly rows (`location`, UTC `time`, ...) for several locations at once."""
+        marks = ",".join("?" * len(locations))
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT location, time_utc, temperature, wind FROM hourly"
+                f" WHERE location IN ({marks}) AND time_utc >= ? ORDER BY location, time_utc",
+                self._conn, params=[*locations, int(since_utc)],
+            )
+        return pd.DataFrame({
+            "location": df["location"],
+            "time": pd.to_datetime(df["time_utc"], unit="s", utc=True),
+            "temperature (°C)": df["temperature"],
+            "wind (km/h)": df["wind"],
+        })
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> HourlyStore:
+    """Return the store shared by every session in this process."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HourlyStore()
+        return _store